@@ -4,21 +4,10 @@ import sys
 from pprint import pformat
 import os
 
-logger = logging.getLogger("logger")
-logger.setLevel(logging.DEBUG)
-handler = logging.StreamHandler(sys.stdout)
-formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
-handler.setFormatter(formatter)
-logger.addHandler(handler)
+logger = logging.getLogger(__name__)
 PUZZLE_INPUT = f"{os.path.dirname(os.path.realpath(__file__))}/puzzle_input.txt"
 
 
-def parse_input():
-    with open(PUZZLE_INPUT, "r") as f:
-        lines = f.readlines()
-    return lines
-
-
 from dataclasses import dataclass
 
 
@@ -48,9 +37,8 @@ class Tournament:
         "Z": RpsOption("scissors", "C", 3),
     }
 
-    def __init__(self):
-        with open(PUZZLE_INPUT) as f:
-            self.rounds = [line.strip().split(" ") for line in f.readlines()]
+    def __init__(self, rounds: list):
+        self.rounds = rounds
 
         self.total_points = 0
         for players in self.rounds:
@@ -91,11 +79,6 @@ class Tournament:
         return total
 
 
-tourney = Tournament()
-print(tourney.total_points)
-print(tourney.rock_paper_scissors("rock", "scissors"))
-
-
 # ==============================================================================
 class RockPaperScissors:
     loses_against = {
@@ -123,9 +106,9 @@ class RockPaperScissors:
             return f"{player1_choice} loss"
         return "draw"
 
-    def __init__(self):
-        with open(PUZZLE_INPUT) as f:
-            self.rounds = [line.strip().split(" ") for line in f.readlines()]
+    def __init__(self, rounds: list):
+        # copy each round, results get appended to them below
+        self.rounds = [list(round) for round in rounds]
 
         for round in self.rounds:
             player1_choice = self.choice_map[round[0]]
@@ -151,5 +134,30 @@ class RockPaperScissors:
             self.total_points += round_points
 
 
-rps = RockPaperScissors()
-pprint(rps.total_points)
+def parse(text):
+    return [line.strip().split(" ") for line in text.splitlines()]
+
+
+def part1(rounds):
+    return Tournament(rounds).total_points
+
+
+def part2(rounds):
+    return RockPaperScissors(rounds).total_points
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.DEBUG,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        stream=sys.stdout,
+    )
+    with open(PUZZLE_INPUT) as f:
+        rounds = parse(f.read())
+
+    tourney = Tournament(rounds)
+    print(tourney.total_points)
+    print(tourney.rock_paper_scissors("rock", "scissors"))
+
+    rps = RockPaperScissors(rounds)
+    print(rps.total_points)
@@ -4,21 +4,10 @@ import sys
 from pprint import pformat
 import os
 
-logger = logging.getLogger("logger")
-logger.setLevel(logging.DEBUG)
-handler = logging.StreamHandler(sys.stdout)
-formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
-handler.setFormatter(formatter)
-logger.addHandler(handler)
+logger = logging.getLogger(__name__)
 PUZZLE_INPUT = f"{os.path.dirname(os.path.realpath(__file__))}/puzzle_input.txt"
 
 
-def parse_input():
-    with open(PUZZLE_INPUT, "r") as f:
-        lines = f.readlines()
-    return lines
-
-
 # --- Day 3: Rucksack Reorganization ---
 # One Elf has the important job of loading all of the rucksacks with supplies for the jungle journey. Unfortunately, that Elf didn't quite follow the packing instructions, and so a few items now need to be rearranged.
 
@@ -77,9 +66,6 @@ def character_range(start, stop, alphanumeric=False) -> list:
     return char_list
 
 
-duplicate_item_total_priority = 0
-elf_group_badge_total_priority = 0
-
 character_priorty = {}
 for char in enumerate(
     character_range("a", "z", alphanumeric=True)
@@ -87,25 +73,43 @@ for char in enumerate(
 ):
     character_priorty[char[-1]] = char[0] + 1
 
-with open(PUZZLE_INPUT) as f:
-    rucksacks = [line.strip() for line in f.readlines()]
 
-# Part 1 - Duplicate Item priority
-for sack in rucksacks:
-    items_per_compartment = int(len(sack) / 2)
-    cmpt1 = sack[:items_per_compartment]
-    cmpt2 = sack[items_per_compartment:]
-    common_letter = next(iter(set(cmpt1).intersection(cmpt2)))
-    duplicate_item_total_priority += character_priorty[common_letter]
+def parse(text):
+    return [line.strip() for line in text.splitlines()]
 
-# Part 2 - Duplicate Item priority
-elf_group_size = 3
-elf_groups = grouper(rucksacks, 3)
-for group in elf_groups:
-    common_letter = set(group[0]) & set(group[1]) & set(group[2])
-    common_letter = next(iter(common_letter))
-    elf_group_badge_total_priority += character_priorty[common_letter]
+
+# Part 1 - Duplicate Item priority
+def part1(rucksacks):
+    duplicate_item_total_priority = 0
+    for sack in rucksacks:
+        items_per_compartment = int(len(sack) / 2)
+        cmpt1 = sack[:items_per_compartment]
+        cmpt2 = sack[items_per_compartment:]
+        common_letter = next(iter(set(cmpt1).intersection(cmpt2)))
+        duplicate_item_total_priority += character_priorty[common_letter]
+    return duplicate_item_total_priority
 
 
-print("duplicate item total priority", duplicate_item_total_priority)
-print("elf group badge total priority", elf_group_badge_total_priority)
+# Part 2 - Duplicate Item priority
+def part2(rucksacks):
+    elf_group_badge_total_priority = 0
+    elf_group_size = 3
+    elf_groups = grouper(rucksacks, elf_group_size)
+    for group in elf_groups:
+        common_letter = set(group[0]) & set(group[1]) & set(group[2])
+        common_letter = next(iter(common_letter))
+        elf_group_badge_total_priority += character_priorty[common_letter]
+    return elf_group_badge_total_priority
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.DEBUG,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        stream=sys.stdout,
+    )
+    with open(PUZZLE_INPUT) as f:
+        rucksacks = parse(f.read())
+
+    print("duplicate item total priority", part1(rucksacks))
+    print("elf group badge total priority", part2(rucksacks))
@@ -4,21 +4,10 @@ import sys
 from pprint import pformat
 import os
 
-logger = logging.getLogger("logger")
-logger.setLevel(logging.DEBUG)
-handler = logging.StreamHandler(sys.stdout)
-formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
-handler.setFormatter(formatter)
-logger.addHandler(handler)
+logger = logging.getLogger(__name__)
 PUZZLE_INPUT = f"{os.path.dirname(os.path.realpath(__file__))}/puzzle_input.txt"
 
 
-def parse_input():
-    with open(PUZZLE_INPUT, "r") as f:
-        lines = f.readlines()
-    return lines
-
-
 # --- Day 4: Camp Cleanup ---
 # Space needs to be cleared before the last supplies can be unloaded from the ships, and so several Elves have been assigned the job of cleaning up sections of the camp. Every section has a unique ID number, and each Elf is assigned a range of section IDs.
 
@@ -61,25 +50,35 @@ def parse_input():
 # In how many assignment pairs does one range fully contain the other?
 
 
-elf_groups = []
-for line in parse_input():
-    elf_groups.append(line.strip().split(","))
-
-overlap_count = 0
-for elf in elf_groups:
-    elf1 = elf[0].split("-")
-    elf2 = elf[1].split("-")
-    elf1_range = range(int(elf1[0]), int(elf1[1]) + 1)
-    elf2_range = range(int(elf2[0]), int(elf2[1]) + 1)
-    if set(elf1_range).issubset(set(elf2_range)) or set(elf2_range).issubset(
-        set(elf1_range)
-    ):
-        logger.debug(
-            f"{elf1}, {elf2}, {set(elf1_range)}, {set(elf2_range)}, {overlap_count}"
-        )
-        overlap_count += 1
+def parse(text):
+    elf_groups = []
+    for line in text.splitlines():
+        elf_groups.append(line.strip().split(","))
+    return elf_groups
+
+
+def part1(elf_groups):
+    overlap_count = 0
+    for elf in elf_groups:
+        elf1 = elf[0].split("-")
+        elf2 = elf[1].split("-")
+        elf1_range = range(int(elf1[0]), int(elf1[1]) + 1)
+        elf2_range = range(int(elf2[0]), int(elf2[1]) + 1)
+        if set(elf1_range).issubset(set(elf2_range)) or set(elf2_range).issubset(
+            set(elf1_range)
+        ):
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "%s, %s, %s, %s, %s",
+                    elf1,
+                    elf2,
+                    set(elf1_range),
+                    set(elf2_range),
+                    overlap_count,
+                )
+            overlap_count += 1
+    return overlap_count
 
-print("complete overlap:", overlap_count)
 
 # --- Part Two ---
 # It seems like there is still quite a bit of duplicate work planned. Instead, the Elves would like to know the number of pairs that overlap at all.
@@ -93,17 +92,37 @@ print("complete overlap:", overlap_count)
 # So, in this example, the number of overlapping assignment pairs is 4.
 
 # In how many assignment pairs do the ranges overlap?
-partial_overlap_count = 0
-for elf in elf_groups:
-    elf1 = elf[0].split("-")
-    elf2 = elf[1].split("-")
-    elf1_range = range(int(elf1[0]), int(elf1[1]) + 1)
-    elf2_range = range(int(elf2[0]), int(elf2[1]) + 1)
-    if set(elf1_range).intersection(set(elf2_range)) or set(elf2_range).intersection(
-        set(elf1_range)
-    ):
-        logger.debug(
-            f"{elf1}, {elf2}, {set(elf1_range)}, {set(elf2_range)}, {partial_overlap_count}"
-        )
-        partial_overlap_count += 1
-print("partial overlap:", partial_overlap_count)
+def part2(elf_groups):
+    partial_overlap_count = 0
+    for elf in elf_groups:
+        elf1 = elf[0].split("-")
+        elf2 = elf[1].split("-")
+        elf1_range = range(int(elf1[0]), int(elf1[1]) + 1)
+        elf2_range = range(int(elf2[0]), int(elf2[1]) + 1)
+        if set(elf1_range).intersection(set(elf2_range)) or set(elf2_range).intersection(
+            set(elf1_range)
+        ):
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "%s, %s, %s, %s, %s",
+                    elf1,
+                    elf2,
+                    set(elf1_range),
+                    set(elf2_range),
+                    partial_overlap_count,
+                )
+            partial_overlap_count += 1
+    return partial_overlap_count
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.DEBUG,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        stream=sys.stdout,
+    )
+    with open(PUZZLE_INPUT) as f:
+        elf_groups = parse(f.read())
+
+    print("complete overlap:", part1(elf_groups))
+    print("partial overlap:", part2(elf_groups))
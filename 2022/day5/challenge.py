@@ -4,21 +4,10 @@ import sys
 import logging
 from pprint import pformat, pprint
 
-logger = logging.getLogger("logger")
-logger.setLevel(logging.DEBUG)
-handler = logging.StreamHandler(sys.stdout)
-formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
-handler.setFormatter(formatter)
-logger.addHandler(handler)
+logger = logging.getLogger(__name__)
 PUZZLE_INPUT = f"{os.path.dirname(os.path.realpath(__file__))}/puzzle_input.txt"
 
 
-def parse_input():
-    with open(PUZZLE_INPUT, "r") as f:
-        lines = f.readlines()
-    return lines
-
-
 # --- Day 5: Supply Stacks ---
 # The expedition can depart as soon as the final supplies have been unloaded from the ships. Supplies are stored in stacks of marked crates, but because the needed supplies are buried under many other crates, the crates need to be rearranged.
 
@@ -86,12 +75,6 @@ ORIGINAL_CRATE_STACKS = {
 }
 
 
-def parse_input():
-    with open(PUZZLE_INPUT, "r") as f:
-        lines = f.readlines()
-    return lines
-
-
 def parse_directions(input_diagram):
 
     # find empty line
@@ -103,7 +86,8 @@ def parse_directions(input_diagram):
             stack_lines = input_diagram[: _ - 1]  # get all lines before empty line
             break
     moves = input_diagram[_ + 1 :]  # get all lines after empty line
-    logger.info("stack defined\n" + pformat(stack_lines))
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("stack defined\n%s", pformat(stack_lines))
 
     # sanitize stack
     # for _, line in enumerate(stack_lines):
@@ -130,32 +114,40 @@ def parse_directions(input_diagram):
                 )
             ]
         )
-    logger.info("moves parsed:" + pformat(len(parsed_moves)))
-    logger.debug("moves parsed:" + pformat(parsed_moves))
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("moves parsed:%s", len(parsed_moves))
+        logger.debug("moves parsed:%s", pformat(parsed_moves))
 
     return stack, parsed_moves
 
 
-existing_stack, moves = parse_directions(parse_input())
+def parse(text):
+    # The starting stacks are transcribed by hand, only the moves get parsed
+    _, moves = parse_directions(text.splitlines(keepends=True))
+    return ORIGINAL_CRATE_STACKS, moves
 
 
 def execute_moves(stacks, moves, simultaneous=True):
     tmp_stacks = deepcopy(stacks)
-    logger.debug("starting stacks\n:" + pformat(tmp_stacks))
+    # checked once, the stacks are only formatted when they'll be logged
+    debug = logger.isEnabledFor(logging.DEBUG)
+    if debug:
+        logger.debug("starting stacks\n:%s", pformat(tmp_stacks))
     for move in moves:
         number_of_crates = move[0]
         src_stack = move[1]
         dst_stack = move[2]
-        logger.debug(f"moving {number_of_crates} from {src_stack} to {dst_stack}")
-        logger.debug(
-            "before:\n"
-            + pformat(
-                {
-                    f"src_{src_stack}": tmp_stacks[src_stack],
-                    f"dst_{dst_stack}": tmp_stacks[dst_stack],
-                }
+        if debug:
+            logger.debug("moving %s from %s to %s", number_of_crates, src_stack, dst_stack)
+            logger.debug(
+                "before:\n%s",
+                pformat(
+                    {
+                        f"src_{src_stack}": tmp_stacks[src_stack],
+                        f"dst_{dst_stack}": tmp_stacks[dst_stack],
+                    }
+                ),
             )
-        )
         if simultaneous:
             crates = []
             crates = tmp_stacks[src_stack][-number_of_crates:]
@@ -163,25 +155,29 @@ def execute_moves(stacks, moves, simultaneous=True):
             tmp_stacks[dst_stack] += crates
         else:
             for i in range(0, number_of_crates):
-                logger.debug(tmp_stacks[src_stack])
+                if debug:
+                    logger.debug(tmp_stacks[src_stack])
                 tmp_stacks[dst_stack].append(tmp_stacks[src_stack].pop())
-        logger.debug(
-            "after:\n"
-            + pformat(
-                {
-                    f"src_{src_stack}": tmp_stacks[src_stack],
-                    f"dst_{dst_stack}": tmp_stacks[dst_stack],
-                }
+        if debug:
+            logger.debug(
+                "after:\n%s",
+                pformat(
+                    {
+                        f"src_{src_stack}": tmp_stacks[src_stack],
+                        f"dst_{dst_stack}": tmp_stacks[dst_stack],
+                    }
+                ),
             )
-        )
     return tmp_stacks
 
 
-# crate_stacks = execute_moves(ORIGINAL_CRATE_STACKS, moves, simultaneous=False)
-# top_crates = []
-# for x, y in crate_stacks.items():
-#     top_crates.append(y[-1])
-# logger.info("one-at-a-time moves: top crates in each stack:" + "".join(top_crates))
+def part1(directions):
+    stacks, moves = directions
+    crate_stacks = execute_moves(stacks, moves, simultaneous=False)
+    top_crates = []
+    for x, y in crate_stacks.items():
+        top_crates.append(y[-1])
+    return "".join(top_crates)
 
 
 # --- Part Two ---
@@ -228,11 +224,26 @@ def execute_moves(stacks, moves, simultaneous=True):
 
 # Before the rearrangement process finishes, update your simulation so that the Elves know where they should stand to be ready to unload the final supplies. After the rearrangement procedure completes, what crate ends up on top of each stack?
 
-crate_stacks = execute_moves(ORIGINAL_CRATE_STACKS, moves)
-logger.debug("final stacks\n:" + pformat(crate_stacks))
-top_crates = []
-for stack in crate_stacks.values():
-    top_crates.append(stack[-1])
-logger.info(
-    "simultaneous moves: top crates in each stack:" + pformat("".join(top_crates))
-)
+
+def part2(directions):
+    stacks, moves = directions
+    crate_stacks = execute_moves(stacks, moves)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("final stacks\n:%s", pformat(crate_stacks))
+    top_crates = []
+    for stack in crate_stacks.values():
+        top_crates.append(stack[-1])
+    return "".join(top_crates)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.DEBUG,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        stream=sys.stdout,
+    )
+    with open(PUZZLE_INPUT) as f:
+        directions = parse(f.read())
+
+    logger.info("one-at-a-time moves: top crates in each stack:%r", part1(directions))
+    logger.info("simultaneous moves: top crates in each stack:%r", part2(directions))
@@ -2,23 +2,15 @@
 import os
 import sys
 import logging
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from pprint import pformat, pprint
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional
 
-logger = logging.getLogger("logger")
-logger.setLevel(logging.INFO)
-handler = logging.StreamHandler(sys.stdout)
-formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
-handler.setFormatter(formatter)
-logger.addHandler(handler)
+logger = logging.getLogger(__name__)
 PUZZLE_INPUT = f"{os.path.dirname(os.path.realpath(__file__))}/puzzle_input.txt"
 
 
-def parse_input():
-    with open(PUZZLE_INPUT, "r") as f:
-        lines = f.readlines()
-    return lines
-
-
 # --- Day 6: Tuning Trouble ---
 # The preparations are finally complete; you and the Elves leave camp on foot and begin to make your way toward the star fruit grove.
 
@@ -50,20 +42,98 @@ def parse_input():
 # How many characters need to be processed before the first start-of-packet marker is detected?
 
 # Your puzzle answer was 100. ???
-signal = parse_input()[0].rstrip()
-
-logger.debug(f"signal: {signal}")
+def parse(text):
+    signal = text.splitlines()[0].rstrip()
+    logger.debug("signal: %s", signal)
+    return signal
+
+
+def find_markers(stream: Iterable, windows: Iterable[int]) -> Dict[int, Optional[int]]:
+    """Number of symbols read when the last k of them were all different, for every k
+
+    One pass, O(1) per symbol whatever the window sizes: the table holds the
+    last position each symbol was seen at, which is enough to know where the
+    current run of distinct symbols starts. The run only ever grows one
+    symbol at a time, so the first time it's k long is the marker for k.
+    Stops reading as soon as every window has been found. stream can be a
+    str, bytes or any iterator of symbols, so it's never held in memory all
+    at once.
+
+    Args:
+        stream (Iterable): characters, or byte values when reading a file
+        windows (Iterable[int]): numbers of distinct symbols in a row to look for
+
+    Raises:
+        ValueError: raised when a window is less than 1
+
+    Returns:
+        Dict[int, Optional[int]]: window -> position just past its marker, None if there isn't one
+    """
+    found = dict.fromkeys(windows)
+    if any(window < 1 for window in found):
+        raise ValueError(f"windows must be at least 1, not {sorted(found)}")
+    pending = sorted(found, reverse=True)  # smallest window last, popped first
+    last_seen = {}
+    run_start = 0  # first position of the current run of distinct symbols
+    for position, symbol in enumerate(stream):
+        if not pending:
+            break
+        previous = last_seen.get(symbol, -1)
+        if previous >= run_start:
+            run_start = previous + 1
+        last_seen[symbol] = position
+        while pending and position - run_start + 1 == pending[-1]:
+            found[pending.pop()] = position + 1
+    return found
+
+
+def find_marker(stream: Iterable, window: int) -> Optional[int]:
+    """Position just past the first `window` distinct symbols in stream, or None"""
+    return find_markers(stream, (window,))[window]
+
+
+def find_markers_in_streams(
+    streams: Iterable, windows: Iterable[int], workers: Optional[int] = None
+) -> List[Dict[int, Optional[int]]]:
+    """find_markers for each of many datastreams, spread over a process pool
+
+    Args:
+        streams (Iterable): str or bytes datastreams
+        windows (Iterable[int]): window sizes to find in every stream
+        workers (Optional[int]): pool size, 1 runs everything in this process
+
+    Returns:
+        List[Dict[int, Optional[int]]]: the markers of each stream, in order
+    """
+    search = partial(find_markers, windows=tuple(windows))
+    if workers == 1:
+        return [search(stream) for stream in streams]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(search, streams, chunksize=16))
+
+
+def read_symbols(f: BinaryIO, chunk_size: int = 1 << 16) -> Iterator[int]:
+    """Byte values of the first line of a binary file, read a chunk at a time"""
+    for chunk in iter(partial(f.read, chunk_size), b""):
+        line_end = chunk.find(b"\n")
+        if line_end != -1:
+            yield from chunk[:line_end]
+            return
+        yield from chunk
+
+
+def find_marker_in_file(path, window: int, chunk_size: int = 1 << 16) -> Optional[int]:
+    """find_marker over a datastream file, without loading it"""
+    with open(path, "rb") as f:
+        return find_marker(read_symbols(f, chunk_size), window)
 
 
 def find_start_of_packet(signal, start):
-    for i in range(len(signal)):
-        if i >= start:
-            current_set = set(signal[i - start : i])
-            if len(current_set) == start:
-                return i
+    return find_marker(signal, start)
 
 
-print("packet:", find_start_of_packet(signal, 4))
+def part1(signal):
+    return find_start_of_packet(signal, 4)
 
 # --- Part Two ---
 # Your device's communication system is correctly detecting packets, but still isn't working. It looks like it also needs to look for messages.
@@ -79,4 +149,18 @@ print("packet:", find_start_of_packet(signal, 4))
 # zcfzfwzzqfrljwzlrfnpqdbhtmscgvjw: first marker after character 26
 # How many characters need to be processed before the first start-of-message marker is detected?
 
-print("message:", find_start_of_packet(signal, 14))
+
+def part2(signal):
+    return find_start_of_packet(signal, 14)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        stream=sys.stdout,
+    )
+    with open(PUZZLE_INPUT) as f:
+        signal = parse(f.read())
+    print("packet:", part1(signal))
+    print("message:", part2(signal))
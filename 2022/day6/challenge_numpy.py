@@ -0,0 +1,140 @@
+#!/usr/bin/python
+# --- Day 6: Tuning Trouble ---
+# Vectorised marker search for very large datastreams, see challenge.py for the puzzle.
+# A window of symbols is all different when or-ing a bit per symbol over it
+# sets as many bits as the window is long, or equally when the latest
+# previous occurrence of anything in the window falls before its start.
+import os
+import sys
+import logging
+from typing import Optional
+import numpy as np
+
+logger = logging.getLogger(__name__)
+PUZZLE_INPUT = f"{os.path.dirname(os.path.realpath(__file__))}/puzzle_input.txt"
+
+NEWLINE = ord("\n")
+
+
+def previous_occurrence(symbols: np.ndarray) -> np.ndarray:
+    """Index of the previous occurrence of each symbol, -1 for a first occurrence"""
+    # a stable sort groups equal symbols while keeping them in stream order
+    order = np.argsort(symbols, kind="stable")
+    ordered = symbols[order]
+    same = ordered[1:] == ordered[:-1]
+    previous = np.full(len(symbols), -1, dtype=np.int64)
+    previous[order[1:][same]] = order[:-1][same]
+    return previous
+
+
+def window_reduce(values: np.ndarray, window: int, combine=np.maximum) -> np.ndarray:
+    """combine.reduce(values[j : j + window]) for every window start j, in O(n log window)
+
+    The span covered is doubled up to the largest power of two that fits,
+    then two overlapping spans cover the whole window, which is fine for
+    idempotent operations like maximum and bitwise or.
+    """
+    reduced, span = values, 1
+    while span * 2 <= window:
+        reduced = combine(reduced[:-span], reduced[span:])
+        span *= 2
+    starts = len(values) - window + 1
+    return combine(reduced[:starts], reduced[window - span : window - span + starts])
+
+
+def distinct_windows(symbols: np.ndarray, window: int) -> np.ndarray:
+    """For every window start, whether the `window` symbols from it are all different
+
+    Symbols are mapped to one bit each, so a window is distinct when its
+    bits or-ed together have `window` bits set. That needs at most 64
+    different symbols (and np.bitwise_count), otherwise the latest previous
+    occurrence inside each window is compared with the window's start.
+    """
+    present = np.flatnonzero(np.bincount(symbols, minlength=256))
+    if len(present) < window:
+        return np.zeros(len(symbols) - window + 1, dtype=bool)
+    if len(present) <= 64 and hasattr(np, "bitwise_count"):
+        mask_type = next(
+            dtype for dtype in (np.uint8, np.uint16, np.uint32, np.uint64)
+            if np.iinfo(dtype).bits >= len(present)
+        )
+        bits = np.zeros(256, dtype=mask_type)
+        bits[present] = np.left_shift(mask_type(1), np.arange(len(present), dtype=mask_type))
+        masks = window_reduce(bits[symbols], window, np.bitwise_or)
+        return np.bitwise_count(masks) == window
+    window_starts = np.arange(len(symbols) - window + 1)
+    return window_reduce(previous_occurrence(symbols), window) < window_starts
+
+
+def find_marker(symbols, window: int, chunk_size: int = 1 << 18) -> Optional[int]:
+    """Number of symbols read when the last `window` of them were all different
+
+    Matches challenge.find_marker on the first line of the stream. The
+    stream is processed chunk_size symbols at a time, each chunk overlapping
+    the previous one by window - 1 symbols so no window is missed, which
+    keeps memory bounded however big the stream (or memmap) is.
+
+    Args:
+        symbols: uint8 array (a np.memmap works), bytes or str
+        window (int): number of distinct symbols in a row to look for
+        chunk_size (int): symbols per chunk, before the overlap
+
+    Raises:
+        ValueError: raised when window is less than 1
+
+    Returns:
+        Optional[int]: position just past the marker, None if there isn't one
+    """
+    if window < 1:
+        raise ValueError(f"window must be at least 1, not {window}")
+    if isinstance(symbols, str):
+        symbols = symbols.encode()
+    if isinstance(symbols, (bytes, bytearray)):
+        symbols = np.frombuffer(symbols, dtype=np.uint8)
+
+    for start in range(0, len(symbols), chunk_size):
+        offset = max(start - (window - 1), 0)
+        chunk = np.asarray(symbols[offset : start + chunk_size])
+        line_end = np.flatnonzero(chunk == NEWLINE)
+        if line_end.size:
+            chunk = chunk[: line_end[0]]
+        logger.debug("find_marker - %s symbols from %s", len(chunk), offset)
+
+        if len(chunk) >= window:
+            hits = np.flatnonzero(distinct_windows(chunk, window))
+            if hits.size:
+                return offset + int(hits[0]) + window
+        if line_end.size:
+            break
+    return None
+
+
+def find_marker_in_file(path, window: int, chunk_size: int = 1 << 18) -> Optional[int]:
+    """find_marker over a memory mapped datastream file"""
+    if os.path.getsize(path) == 0:
+        return None
+    return find_marker(np.memmap(path, dtype=np.uint8, mode="r"), window, chunk_size)
+
+
+def parse(text):
+    return np.frombuffer(text.splitlines()[0].rstrip().encode(), dtype=np.uint8)
+
+
+def part1(signal):
+    return find_marker(signal, 4)
+
+
+def part2(signal):
+    return find_marker(signal, 14)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        stream=sys.stdout,
+    )
+    with open(PUZZLE_INPUT) as f:
+        signal = parse(f.read())
+    print("packet:", part1(signal))
+    print("message:", part2(signal))
@@ -72,89 +72,41 @@
 # To begin, find all of the directories with a total size of at most 100000, then calculate the sum of their total sizes. In the example above, these directories are a and e; the sum of their total sizes is 95437 (94853 + 584). (As in this example, this process can count files more than once!)
 
 # Find all of the directories with a total size of at most 100000. What is the sum of the total sizes of those directories?
+import io
+import logging
 import os
 import sys
 from pprint import pprint
 
 # Import local modules
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
-sys.path.append(os.path.dirname(SCRIPT_DIR))
+sys.path.append(SCRIPT_DIR)
 
 from classes import *
 
+logger = logging.getLogger(__name__)
 PUZZLE_INPUT_FILE = f"{os.path.dirname(os.path.realpath(__file__))}/puzzle_input.txt"
-with open(PUZZLE_INPUT_FILE, "r") as f:
-    PUZZLE_INPUT = f.read().splitlines()
 
 
-fs = SuperBlock([])
-bash = Bash(fs)
-for line in PUZZLE_INPUT:
-    logger.info(
-        f"{bash.prompt} {PUZZLE_INPUT.index(line)} {line}",
-    )
-    line_items = line.split(" ")
-    match line_items[0]:
-        case "$":
-            match line_items[1]:
-                case "cd":
-                    bash.cd(line_items[-1])
-                case "ls":
-                    bash.ls()
-        case "dir":
-            bash.mkdir(line_items[-1])
-        case x if int(x):
-            bash.touch(line_items[-1], int(line_items[0]))
-        case _:
-            raise ValueError("Failed to parse line_items: %s", line_items)
-print(
-    "EOF!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!"
-)
-bash.cd()
-logger.info("starting tests------------------------------------")
-logger.info("Basic counts------")
-print("total_inodes", len(bash.filesystem.inodes))
-print(
-    "dirs", len([node for node in bash.filesystem.inodes if node.inode_type == "dir"])
-)
-print(
-    "files", len([node for node in bash.filesystem.inodes if node.inode_type == "file"])
-)
-
-print("find Children------")
-pprint(
-    bash.ls(
-        "/vpfdwq/zzp/zbdpt/jjmfpmnn/wqzq",
-    )
-)
-
-print("add size------")
-random_dirs = [inode for inode in fs.find_inodes({"inode_type": "file"})][:5]
-pprint(random_dirs)
-pprint(sum([node.size for node in random_dirs]))
-
-print("find by filter------")
-pprint(fs.find_inodes({"name": "rrqzqwl.frp", "size": 59022}))
-
-print("du------")
-print("/vpfdwq/zzp/zbdpt/jjmfpmnn/wqzq/, non-recursively")
-print("result:")
-pprint(bash.du("/vpfdwq/zzp/zbdpt/jjmfpmnn/wqzq/"))
-print("expected: 612922")
-print("/vpfdwq/zzp/zbdpt/jjmfpmnn/wqzq/, recursively")
-print("result:")
-pprint(bash.du("/vpfdwq/zzp/zbdpt/jjmfpmnn/wqzq/", recursive=True))
-print("expected: 1258704")
-
-print("find all dirs with size <= 100000------")
-nodes_less_than_100000 = []
-for node in bash.filesystem.inodes:
-    if node.inode_type == "dir":
-        if node.size <= 100000:
-            print(node, node.size)
-            nodes_less_than_100000.append((node))
-nodes_less_than_100000_total_size = sum([node.size for node in nodes_less_than_100000])
-print("total size", nodes_less_than_100000_total_size)  # expected 1232307
+def replay_transcript(lines):
+    """Replay a terminal transcript line by line, returning the resulting shell"""
+    bash = replay(Bash(SuperBlock()), read_transcript(lines), bulk=True)
+    bash.cd()
+    return bash
+
+
+def parse(text):
+    return replay_transcript(io.StringIO(text))
+
+
+def find_small_dirs(bash, max_size=100000):
+    fs = bash.filesystem
+    return [fs.inode(inode_id) for inode_id in sorted(fs.size_index.between(high=max_size))]
+
+
+def part1(bash, max_size=100000):
+    return bash.filesystem.size_index.total(high=max_size)
+
 
 # --- Part Two ---
 # Now, you're ready to choose a directory to delete.
@@ -175,33 +127,97 @@ print("total size", nodes_less_than_100000_total_size)  # expected 1232307
 
 TOTAL_FS_SIZE = 70000000
 REQUIRED_FREE_SPACE = 30000000
-CURRENT_USED_SPACE = bash.du("/", recursive=True)
-CURRENT_FREE_SPACE = TOTAL_FS_SIZE - CURRENT_USED_SPACE
-SIZE_TARGET = REQUIRED_FREE_SPACE - CURRENT_FREE_SPACE
-
-smallest_dir = None
-dirs = bash.filesystem.find_inodes({"inode_type": "dir"})
-for dir in dirs:
-    if dir.size >= SIZE_TARGET:
-        logger.debug(
-            f"candidate dir: {dir}, size: {dir.size}, existing smallest_dir: {smallest_dir}, size: {smallest_dir.size if smallest_dir else None}"
-        )
-        if smallest_dir and smallest_dir.size > dir.size:
-            logger.debug("Replacing smallest dir. %s < %s", smallest_dir, dir)
-            smallest_dir = dir
-        elif not smallest_dir:
-            logger.debug("smallest dir was None, setting to %s", dir)
-            smallest_dir = dir
-
-pprint(
-    {
+
+
+def find_dir_to_delete(bash):
+    current_used_space = bash.du("/", recursive=True)
+    current_free_space = TOTAL_FS_SIZE - current_used_space
+    size_target = REQUIRED_FREE_SPACE - current_free_space
+
+    smallest_dir_id = bash.filesystem.size_index.smallest_at_least(size_target)
+    smallest_dir = bash.filesystem.inode(smallest_dir_id)
+    logger.debug("smallest dir of at least %s: %s", size_target, smallest_dir)
+
+    return {
         "smallest_dir": smallest_dir,
-        "size target": SIZE_TARGET,
+        "size target": size_target,
         "total filesystem size": TOTAL_FS_SIZE,
         "required free space": REQUIRED_FREE_SPACE,
-        "currently used space": CURRENT_USED_SPACE,
-        "currently free space": CURRENT_FREE_SPACE,
-        "resulting free space if smallest_dir is deleted": CURRENT_FREE_SPACE
+        "currently used space": current_used_space,
+        "currently free space": current_free_space,
+        "resulting free space if smallest_dir is deleted": current_free_space
         + smallest_dir.size,
     }
-)
+
+
+def part2(bash):
+    return find_dir_to_delete(bash)["smallest_dir"].size
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.DEBUG,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        stream=sys.stdout,
+    )
+    # A transcript path (or - for stdin) may be passed instead of the puzzle input,
+    # or a filesystem saved by SuperBlock.save, which is mapped instead of replayed
+    transcript_file = sys.argv[1] if len(sys.argv) > 1 else PUZZLE_INPUT_FILE
+    if transcript_file == "-":
+        bash = replay_transcript(sys.stdin)
+    else:
+        with open(transcript_file, "rb") as f:
+            saved = f.read(len(SUPERBLOCK_MAGIC)) == SUPERBLOCK_MAGIC
+        if saved:
+            bash = Bash(SuperBlock.load(transcript_file))
+        else:
+            with open(transcript_file, "r") as f:
+                bash = replay_transcript(f)
+    fs = bash.filesystem
+
+    print(
+        "EOF!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!"
+    )
+    logger.info("starting tests------------------------------------")
+    logger.info("Basic counts------")
+    print("total_inodes", len(bash.filesystem.inodes))
+    print(
+        "dirs",
+        len([node for node in bash.filesystem.inodes if node.inode_type == "dir"]),
+    )
+    print(
+        "files",
+        len([node for node in bash.filesystem.inodes if node.inode_type == "file"]),
+    )
+
+    print("find Children------")
+    pprint(
+        bash.ls(
+            "/vpfdwq/zzp/zbdpt/jjmfpmnn/wqzq",
+        )
+    )
+
+    print("add size------")
+    random_dirs = [inode for inode in fs.find_inodes({"inode_type": "file"})][:5]
+    pprint(random_dirs)
+    pprint(sum([node.size for node in random_dirs]))
+
+    print("find by filter------")
+    pprint(fs.find_inodes({"name": "rrqzqwl.frp", "size": 59022}))
+
+    print("du------")
+    print("/vpfdwq/zzp/zbdpt/jjmfpmnn/wqzq/, non-recursively")
+    print("result:")
+    pprint(bash.du("/vpfdwq/zzp/zbdpt/jjmfpmnn/wqzq/"))
+    print("expected: 612922")
+    print("/vpfdwq/zzp/zbdpt/jjmfpmnn/wqzq/, recursively")
+    print("result:")
+    pprint(bash.du("/vpfdwq/zzp/zbdpt/jjmfpmnn/wqzq/", recursive=True))
+    print("expected: 1258704")
+
+    print("find all dirs with size <= 100000------")
+    for node in find_small_dirs(bash):
+        print(node, node.size)
+    print("total size", part1(bash))  # expected 1232307
+
+    pprint(find_dir_to_delete(bash))
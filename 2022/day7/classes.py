@@ -1,28 +1,99 @@
 import sys
 import logging
-from typing import Union
+import mmap
+import struct
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import deque
+from fnmatch import fnmatchcase
+from itertools import accumulate, chain, islice
+import operator
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Optional, Union
 
-logger = logging.getLogger("logger")
-logger.setLevel(logging.DEBUG)
-handler = logging.StreamHandler(sys.stdout)
-formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
-handler.setFormatter(formatter)
-logger.addHandler(handler)
+try:
+    import numpy as np
+except ImportError:  # subtree_sizes falls back to pure python
+    np = None
+
+logger = logging.getLogger(__name__)
+
+
+DIR, FILE, FREE = 0, 1, 2
+INODE_TYPES = ("dir", "file", "free")
+ROOT_ID = 0
+NO_PARENT = -1
+
+
+def _prefix(value, prefix) -> bool:
+    """Paths compare component-wise, anything else as a string"""
+    if isinstance(value, tuple):
+        return value[: len(prefix)] == prefix
+    return str(value).startswith(str(prefix))
+
+
+QUERY_OPERATORS = {
+    "$eq": operator.eq,
+    "$ne": operator.ne,
+    "$lt": operator.lt,
+    "$lte": operator.le,
+    "$gt": operator.gt,
+    "$gte": operator.ge,
+    "$in": lambda value, options: value in options,
+    "$prefix": _prefix,
+    "$glob": lambda value, pattern: fnmatchcase(str(value), pattern),
+}
 
 
 class Inode:
-    def __init__(self, path: str, name: str, inode_type: str, size: int):
-        self.path = path
-        self.name = name
-        self.inode_type = inode_type
-        self.size = size
-
-        if self.name == "/":
-            self.abspath = Path("/")
-        elif name:
-            self.abspath = Path(str(self.path) + "/" + self.name)
-        else:
-            self.abspath = Path(self.path)
+    """A handle on one inode of a SuperBlock
+
+    Only the filesystem and the inode id are stored here, every attribute is
+    read from (or written to) the SuperBlock's columns. Paths are rebuilt from
+    the parent ids on demand.
+    """
+
+    __slots__ = ("filesystem", "id")
+
+    def __init__(self, filesystem, inode_id: int):
+        self.filesystem = filesystem
+        self.id = inode_id
+
+    @property
+    def name(self) -> str:
+        return self.filesystem.name(self.id)
+
+    @property
+    def inode_type(self) -> str:
+        return INODE_TYPES[self.filesystem.types[self.id]]
+
+    @property
+    def size(self) -> int:
+        return self.filesystem.sizes[self.id]
+
+    @size.setter
+    def size(self, size: int):
+        # through resize, so the directories above stay in step;
+        # it refuses directories, whose sizes are worked out from their files
+        self.filesystem.resize(self.id, size)
+
+    @property
+    def path(self):
+        return self.filesystem.path(self.id)
+
+    @property
+    def abspath(self):
+        return self.filesystem.abspath(self.id)
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, Inode)
+            and self.filesystem is other.filesystem
+            and self.id == other.id
+        )
+
+    def __hash__(self):
+        return hash((id(self.filesystem), self.id))
 
     def __repr__(self):
         return f"inode({str(self.path)}, {self.name}, {self.inode_type}, {self.size})"
@@ -32,37 +103,368 @@ class Inode:
 
 
 class FileInode(Inode):
-    def __init__(
-        self,
-        path,
-        name,
-        size,
-    ):
-        super().__init__(Path(path), name, "file", size)
+    __slots__ = ()
 
 
 class DirInode(Inode):
-    def __init__(
-        self,
-        path,
-        name,
-        size=0,
-    ):
-        super().__init__(Path(path), name, "dir", size)
+    __slots__ = ()
 
 
 class SuperBlock:
-    def __init__(self, inodes=[]):
-        self.inodes = [DirInode("/", "/")] + inodes
-        self.root = self.inodes[0]
+    """Inode table stored column-wise, indexed by integer inode id
+
+    names holds ids into an interned name table, parents holds the id of the
+    containing directory (NO_PARENT for the root). Each directory keeps a
+    name -> id map of its children, which is what path lookups walk.
+
+    A directory's size is the total of everything below it. It's kept up to
+    date as files are added, resized or removed by walking the parent ids,
+    so reading it is O(1) and updating it is O(depth). Removed inodes are
+    marked FREE rather than renumbered.
+    """
+
+    # most paths path_ids remembers before it starts over, as Path.INTERN_LIMIT
+    PATH_CACHE_LIMIT = 1 << 16
+
+    def __init__(self):
+        self.name_table = []  # name id -> name
+        self.name_ids = {}  # name -> name id
+        self.names = array("i")  # inode id -> name id
+        self.parents = array("q")  # inode id -> parent inode id
+        self.sizes = array("q")  # inode id -> size, dirs include their whole subtree
+        self.file_sizes = array("q")  # inode id -> size of files directly inside it
+        self.types = array("b")  # inode id -> DIR or FILE
+        self.child_ids = []  # inode id -> {name: child id}, None for files
+
+        # secondary indexes, kept up to date by add_inode
+        self.type_index = {DIR: array("q"), FILE: array("q")}  # type -> ids
+        self.name_index = []  # name id -> ids, may include freed inodes
+        self.freed = 0
+        self._size_index = None  # built on first use, dropped when sizes change
+        self.path_ids = {}  # Path -> id of the paths looked up, dropped on remove
+
+        self.root = self.add_inode(NO_PARENT, "/", "dir")
 
     def __repr__(self):
-        return f"super_block({self.inodes})"
+        return f"super_block({len(self)} inodes)"
+
+    def __len__(self):
+        return len(self.types) - self.freed
+
+    @property
+    def inodes(self) -> list:
+        """Every inode, in creation order"""
+        return [
+            self.inode(inode_id)
+            for inode_id in range(len(self.types))
+            if self.types[inode_id] != FREE
+        ]
+
+    def inode(self, inode_id: int) -> Inode:
+        if self.types[inode_id] == DIR:
+            return DirInode(self, inode_id)
+        return FileInode(self, inode_id)
+
+    def intern(self, name: str) -> int:
+        """Id of name in the name table, adding it if it's new"""
+        name_id = self.name_ids.get(name)
+        if name_id is None:
+            name_id = self.name_ids[name] = len(self.name_table)
+            self.name_table.append(sys.intern(name))
+            self.name_index.append(array("q"))
+        return name_id
+
+    def name(self, inode_id: int) -> str:
+        return self.name_table[self.names[inode_id]]
+
+    def abspath(self, inode_id: int):
+        names = []
+        while inode_id != NO_PARENT:
+            names.append(self.name(inode_id))
+            inode_id = self.parents[inode_id]
+        return Path(names[::-1])
+
+    def path(self, inode_id: int):
+        """abspath of the containing directory, the root is its own parent"""
+        if inode_id == ROOT_ID:
+            return self.abspath(ROOT_ID)
+        return self.abspath(self.parents[inode_id])
+
+    def child(self, parent_id: int, name: str):
+        """Id of the inode called name directly inside parent_id, or None"""
+        children = self.child_ids[parent_id]
+        return children.get(name) if children else None
+
+    def child_list(self, inode_id: int) -> list:
+        """Ids of the inodes directly inside inode_id"""
+        children = self.child_ids[inode_id]
+        return list(children.values()) if children else []
+
+    def lookup(self, abspath):
+        """Id of the inode at abspath, or None"""
+        abspath = Path(abspath)
+        inode_id = self.path_ids.get(abspath)
+        if inode_id is not None:
+            return inode_id
+        if not abspath:
+            return None
+        names = abspath[1:] if abspath[0] == "/" else abspath
+        inode_id = ROOT_ID
+        for name in names:
+            inode_id = self.child(inode_id, name)
+            if inode_id is None:
+                return None
+        if len(self.path_ids) >= self.PATH_CACHE_LIMIT:
+            self.path_ids.clear()
+        self.path_ids[abspath] = inode_id
+        return inode_id
+
+    def get(self, abspath):
+        """Finds a single inode by absolute path, or None"""
+        inode_id = self.lookup(abspath)
+        return None if inode_id is None else self.inode(inode_id)
+
+    def children(self, abspath) -> list:
+        """Inodes directly inside the directory at abspath, excluding the root"""
+        inode_id = self.lookup(abspath)
+        if inode_id is None:
+            return []
+        return [self.inode(child_id) for child_id in self.child_list(inode_id)]
+
+    def attribute(self, inode_id: int, key: str):
+        """Value of an Inode attribute, read straight from the columns"""
+        match key:
+            case "name":
+                return self.name(inode_id)
+            case "inode_type":
+                return INODE_TYPES[self.types[inode_id]]
+            case "size":
+                return self.sizes[inode_id]
+            case "path":
+                return self.path(inode_id)
+            case "abspath":
+                return self.abspath(inode_id)
+            case "id":
+                return inode_id
+        return None
+
+    def _conditions(self, where: dict) -> list:
+        """Normalises a where clause into (key, operator, operand) triples
+
+        A bare value is shorthand for {"$eq": value}, path operands are
+        expanded to Path objects so they compare like the path attributes.
+        """
+        if not isinstance(where, dict):
+            raise TypeError(f"where must be a dict, not {type(where)}")
+
+        conditions = []
+        for key, condition in where.items():
+            if not isinstance(condition, dict):
+                condition = {"$eq": condition}
+            for op, operand in condition.items():
+                if op not in QUERY_OPERATORS:
+                    raise ValueError(f"Unknown query operator {op} for {key}")
+                if key in ("path", "abspath"):
+                    if op == "$in":
+                        operand = [Path(option) for option in operand]
+                    elif op != "$glob":
+                        operand = Path(operand)
+                conditions.append((key, op, operand))
+        return conditions
+
+    def _subtree(self, inode_id: int) -> Iterator[int]:
+        """inode_id and the ids of everything below it, depth first"""
+        stack = [inode_id]
+        while stack:
+            inode_id = stack.pop()
+            yield inode_id
+            stack.extend(self.child_list(inode_id))
+
+    def _access_paths(self, conditions: list, ignore_root: bool) -> list:
+        """Every index able to answer the conditions, as (name, rows, candidates, answered)
+
+        rows is the number of candidates the index hands over, exact for all
+        of them except the subtree walk, which is guessed from the depth of
+        its prefix. candidates is a callable so only the chosen plan is read.
+        answered are the conditions every candidate is known to meet, which
+        don't need checking again.
+        """
+        plans = [("scan", len(self.types), lambda: range(len(self.types)), [])]
+        size_low = size_high = None
+        size_conditions = []
+        dirs_only = False
+
+        for condition in conditions:
+            key, op, operand = condition
+            if key == "abspath" and op == "$eq":
+                inode_id = self.lookup(operand)
+                ids = [] if inode_id is None else [inode_id]
+                plans.append(("abspath", len(ids), lambda ids=ids: ids, [condition]))
+            elif key == "path" and op == "$eq":
+                parent_id = self.lookup(operand)
+                ids = [] if parent_id is None else self.child_list(parent_id)
+                # the root is its own parent but isn't indexed as its own child
+                if not ignore_root and parent_id == ROOT_ID:
+                    ids = [ROOT_ID] + ids
+                plans.append(("parent", len(ids), lambda ids=ids: ids, [condition]))
+            elif key in ("path", "abspath") and op in ("$prefix", "$glob"):
+                if op == "$glob":
+                    # only the components before the first wildcard are fixed
+                    fixed = []
+                    for component in Path(operand):
+                        if any(char in component for char in "*?["):
+                            break
+                        fixed.append(component)
+                    operand = Path(fixed)
+                inode_id = self.lookup(operand) if operand else ROOT_ID
+                # everything below a directory has its abspath as a prefix,
+                # but not its path (the directory itself) nor a whole glob
+                answered = [condition] if (key, op) == ("abspath", "$prefix") else []
+                if inode_id is None:
+                    plans.append(("subtree", 0, lambda: [], answered))
+                else:
+                    rows = len(self.types) >> max(len(operand) - 1, 0)
+                    plans.append(
+                        (
+                            "subtree",
+                            rows,
+                            lambda inode_id=inode_id: self._subtree(inode_id),
+                            answered,
+                        )
+                    )
+            elif key == "inode_type" and op in ("$eq", "$in"):
+                types = [operand] if op == "$eq" else list(operand)
+                indexes = [
+                    self.type_index[INODE_TYPES.index(inode_type)]
+                    for inode_type in types
+                    if inode_type in INODE_TYPES[:FREE]
+                ]
+                rows = sum(len(index) for index in indexes)
+                plans.append(("type", rows, lambda indexes=indexes: chain(*indexes), [condition]))
+                dirs_only = dirs_only or types == ["dir"]
+            elif key == "name" and op in ("$eq", "$in"):
+                names = [operand] if op == "$eq" else list(operand)
+                indexes = [
+                    self.name_index[self.name_ids[name]]
+                    for name in names
+                    if name in self.name_ids
+                ]
+                rows = sum(len(index) for index in indexes)
+                plans.append(("name", rows, lambda indexes=indexes: chain(*indexes), [condition]))
+            elif key == "size" and isinstance(operand, int) and op != "$ne":
+                size_conditions.append(condition)
+                # the size index holds whole numbers, so exclusive bounds shift by one
+                if op in ("$eq", "$gte", "$gt"):
+                    low = operand + (op == "$gt")
+                    size_low = low if size_low is None else max(size_low, low)
+                if op in ("$eq", "$lte", "$lt"):
+                    high = operand - (op == "$lt")
+                    size_high = high if size_high is None else min(size_high, high)
+
+        if dirs_only and (size_low is not None or size_high is not None):
+            index = self.size_index
+            plans.append(
+                (
+                    "size",
+                    index.count(size_low, size_high),
+                    lambda: index.between(size_low, size_high),
+                    size_conditions,
+                )
+            )
+        return plans
+
+    def _plan(self, conditions: list, ignore_root: bool):
+        """Cheapest access path for the conditions, fewest candidate rows first"""
+        plans = self._access_paths(conditions, ignore_root)
+        return min(plans, key=lambda plan: plan[1])
+
+    def explain(self, where: dict = {}, ignore_root: bool = True) -> dict:
+        """Which index a query would be read from, without running it
+
+        Returns:
+            dict: {"index": "size", "rows": 12, "conditions": [...]}
+        """
+        conditions = self._conditions(where)
+        index, rows, _, _ = self._plan(conditions, ignore_root)
+        return {"index": index, "rows": rows, "conditions": conditions}
+
+    def query(
+        self,
+        where: dict = {},
+        order_by: Union[str, list, None] = None,
+        limit: Optional[int] = None,
+        fields: Optional[list] = None,
+        ignore_root: bool = True,
+    ) -> list:
+        """Finds inodes matching every condition in a mongo style where clause
+
+        The cheapest index for the conditions supplies the candidates (see
+        explain()), the conditions it doesn't already answer are then checked
+        against the columns of each candidate only.
+
+        Args:
+            where (dict, optional):
+            {
+                inode_type: 'dir',
+                size: {'$gte': 1000, '$lt': 100000},
+                abspath: {'$prefix': '/rhrqttg'},
+                name: {'$glob': '*.txt'},
+            }
+            supported operators are $eq, $ne, $lt, $lte, $gt, $gte, $in,
+            $prefix and $glob.
+            order_by: attribute name, or list of them, prefix with '-' to sort descending
+            limit: return at most this many results
+            fields: return dicts of these attributes instead of Inode objects
+            ignore_root: bool = True (default) - ignore root directory in results
+
+        Returns:
+            list: Inode objects, or dicts when fields is given
+        """
+        conditions = self._conditions(where)
+        index, rows, candidates, answered = self._plan(conditions, ignore_root)
+        logger.debug("query - %s from the %s index (%s rows)", conditions, index, rows)
+        # e.g. a path lookup through the parent index, no need to rebuild every path
+        conditions = [condition for condition in conditions if condition not in answered]
+
+        found_ids = (
+            inode_id
+            for inode_id in candidates()
+            if self.types[inode_id] != FREE
+            and not (ignore_root and inode_id == ROOT_ID)
+            and all(
+                QUERY_OPERATORS[op](self.attribute(inode_id, key), operand)
+                for key, op, operand in conditions
+            )
+        )
+
+        if order_by is None:
+            found_ids = list(islice(found_ids, limit))
+        else:
+            if isinstance(order_by, str):
+                order_by = [order_by]
+            found_ids = list(found_ids)
+            # stable sorts, least significant key first
+            for key in reversed(order_by):
+                descending = key.startswith("-")
+                key = key.lstrip("-")
+                found_ids.sort(
+                    key=lambda inode_id: self.attribute(inode_id, key),
+                    reverse=descending,
+                )
+            found_ids = found_ids[:limit]
+
+        if fields is not None:
+            return [
+                {field: self.attribute(inode_id, field) for field in fields}
+                for inode_id in found_ids
+            ]
+        return [self.inode(inode_id) for inode_id in found_ids]
 
     def find_inodes(self, inode_params: dict = {}, ignore_root: bool = True):
         """Finds Inode objects by a related Inode parameter
 
-        A good way to ensure one dict is a subset of another
+        A good way to ensure one dict is a subset of another.
+        Equality only shorthand for query(), biggest inodes first.
 
         Args:
             inode_params (dict, optional):
@@ -79,99 +481,558 @@ class SuperBlock:
         Returns:
             Inode: inode object
         """
-        found_inodes = []
-        logger.debug(f"find_inodes - Searching for inode with params: {inode_params}")
+        logger.debug("find_inodes - Searching for inode with params: %s", inode_params)
 
         if not isinstance(inode_params, dict):
             raise TypeError(f"inode_params must be a dict, not {type(inode_params)}")
 
-        # expand path argument
-        if "path" in inode_params:
-            inode_params["path"] = Path(inode_params["path"])
-        if "abspath" in inode_params:
-            inode_params["abspath"] = Path(inode_params["abspath"])
+        found = self.query(
+            {key: {"$eq": val} for key, val in inode_params.items()},
+            order_by=["-size", "inode_type"],
+            ignore_root=ignore_root,
+        )
+        logger.debug("find_inodes - Found %s inodes", len(found))
+        return found
+
+    def add_inode(
+        self, parent, name: str, inode_type: str, size: int = 0, update_dir_size: bool = True
+    ) -> Inode:
+        """Creates an inode called name inside parent (an Inode or inode id)
+
+        A file's size is added to every directory above it, unless
+        update_dir_size is False, for callers that work the totals out
+        themselves afterwards.
+        """
+        parent_id = parent.id if isinstance(parent, Inode) else parent
+        if parent_id != NO_PARENT and self.child(parent_id, name) is not None:
+            raise ValueError(f"{self.abspath(parent_id)}/{name} already exists")
+
+        inode_id = len(self.types)
+        type_code = INODE_TYPES.index(inode_type)
+        name_id = self.intern(name)
+        self.names.append(name_id)
+        self.parents.append(parent_id)
+        self.sizes.append(size)
+        self.file_sizes.append(0)
+        self.types.append(type_code)
+        self.child_ids.append({} if type_code == DIR else None)
+
+        if parent_id != NO_PARENT:
+            self.child_ids[parent_id][self.name_table[name_id]] = inode_id
+            if type_code == FILE:
+                self.file_sizes[parent_id] += size
+        self.type_index[type_code].append(inode_id)
+        self.name_index[name_id].append(inode_id)
+        if type_code == DIR:
+            self.invalidate_sizes()
+        elif update_dir_size:
+            self.propagate_size(inode_id, size)
+        return self.inode(inode_id)
+
+    def invalidate_sizes(self):
+        self._size_index = None
 
-        for node in self.inodes:
-            if all(
-                node.__dict__.get(key, None) == val for key, val in inode_params.items()
+    @property
+    def size_index(self):
+        """Directory sizes in sorted order, rebuilt only after a size changed"""
+        if self._size_index is None:
+            self._size_index = SizeIndex(self)
+        return self._size_index
+
+    def propagate_size(self, inode_id: int, delta: int):
+        """Adds delta to the size of every directory above inode_id"""
+        if delta:
+            self.invalidate_sizes()
+        parent_id = self.parents[inode_id]
+        while parent_id != NO_PARENT:
+            self.sizes[parent_id] += delta
+            parent_id = self.parents[parent_id]
+
+    def resize(self, inode, size: int):
+        """Sets a file's size, updating the directories above it"""
+        inode_id = inode.id if isinstance(inode, Inode) else inode
+        if self.types[inode_id] != FILE:
+            raise ValueError(f"{self.abspath(inode_id)} isn't a file")
+        delta = size - self.sizes[inode_id]
+        self.sizes[inode_id] = size
+        self.file_sizes[self.parents[inode_id]] += delta
+        self.propagate_size(inode_id, delta)
+
+    def remove(self, inode):
+        """Removes an inode, and everything below it if it's a directory"""
+        inode_id = inode.id if isinstance(inode, Inode) else inode
+        if inode_id == ROOT_ID:
+            raise ValueError("The root directory can't be removed")
+        parent_id = self.parents[inode_id]
+        if self.types[inode_id] == FILE:
+            self.file_sizes[parent_id] -= self.sizes[inode_id]
+        self.propagate_size(inode_id, -self.sizes[inode_id])
+        del self.child_ids[parent_id][self.name(inode_id)]
+        self.path_ids.clear()
+
+        stack = [inode_id]
+        while stack:
+            inode_id = stack.pop()
+            if self.child_ids[inode_id]:
+                stack.extend(self.child_ids[inode_id].values())
+            self.types[inode_id] = FREE
+            self.parents[inode_id] = NO_PARENT
+            self.sizes[inode_id] = 0
+            self.file_sizes[inode_id] = 0
+            self.child_ids[inode_id] = None
+            self.freed += 1
+        self.invalidate_sizes()
+
+    def recompute_sizes(self):
+        """Rebuilds every directory size from the file sizes in one pass
+
+        For trees built without propagating sizes, see replay(bulk=True).
+        """
+        self.invalidate_sizes()
+        totals, file_sizes = subtree_sizes(self.parents, self.sizes, self.types)
+        self.sizes[:] = totals
+        self.file_sizes[:] = file_sizes
+
+    def save(self, path):
+        """Writes the tree to path in the columnar layout SuperBlock.load maps
+
+        Args:
+            path (str): file to write, replaced if it exists
+        """
+        encoded = [name.encode() for name in self.name_table]
+        name_offsets = array("q", accumulate(map(len, encoded), initial=0))
+        child_offsets = array("q", [0])
+        children, children_by_name = array("q"), array("q")
+        for inode_id in range(len(self.types)):
+            child_ids = self.child_list(inode_id)
+            children.extend(child_ids)
+            children_by_name.extend(
+                sorted(child_ids, key=lambda child_id: encoded[self.names[child_id]])
+            )
+            child_offsets.append(len(children))
+
+        columns = {
+            "parents": self.parents,
+            "sizes": self.sizes,
+            "file_sizes": self.file_sizes,
+            "types": self.types,
+            "names": self.names,
+            "name_offsets": name_offsets,
+            "name_blob": b"".join(encoded),
+            "child_offsets": child_offsets,
+            "children": children,
+            "children_by_name": children_by_name,
+        }
+        logger.debug("save - writing %s inodes to %s", len(self.types), path)
+        with open(path, "wb") as f:
+            f.write(
+                SUPERBLOCK_HEADER.pack(
+                    SUPERBLOCK_MAGIC,
+                    sys.byteorder.encode(),
+                    len(self.types),
+                    len(encoded),
+                    name_offsets[-1],
+                    len(children),
+                    self.freed,
+                )
+            )
+            for column, _, _, offset in _superblock_sections(
+                len(self.types), len(encoded), name_offsets[-1], len(children)
             ):
-                found_inodes.append(node)
-
-        # Handle root directory return
-        # i.e., it usually shouldn't be.
-        if ignore_root and found_inodes and self.root in found_inodes:
-            found_inodes.remove(self.root)
-
-        logger.debug(f"find_inodes - Found {len(found_inodes)} inodes")
-        return sorted(
-            sorted(found_inodes, key=lambda x: x.inode_type),
-            key=lambda x: x.size,
-            reverse=True,
+                f.write(b"\0" * (offset - f.tell()))
+                f.write(bytes(columns[column]))
+
+    @classmethod
+    def load(cls, path) -> "SuperBlock":
+        """Opens a tree written by save() without reading it into memory"""
+        return MappedSuperBlock(path)
+
+
+# On-disk layout written by SuperBlock.save: a header, then every column as
+# raw native-endian array bytes, each section starting on an 8 byte boundary.
+# Children are stored CSR style, child_offsets[i]:child_offsets[i + 1] slices
+# the ids of inode i's children out of children, in the order they were added,
+# and out of children_by_name, sorted by name for lookups.
+SUPERBLOCK_MAGIC = b"AOC7SB02"
+SUPERBLOCK_HEADER = struct.Struct("<8s8sQQQQQ")  # magic, byteorder, counts, freed
+
+
+def _superblock_sections(inodes: int, names: int, blob: int, children: int):
+    """(column, typecode, length, offset) of each section of a saved SuperBlock"""
+    sections = []
+    offset = SUPERBLOCK_HEADER.size
+    for column, typecode, length in (
+        ("parents", "q", inodes),
+        ("sizes", "q", inodes),
+        ("file_sizes", "q", inodes),
+        ("types", "b", inodes),
+        ("names", "i", inodes),
+        ("name_offsets", "q", names + 1),
+        ("name_blob", "B", blob),
+        ("child_offsets", "q", inodes + 1),
+        ("children", "q", children),
+        ("children_by_name", "q", children),
+    ):
+        offset = -(-offset // 8) * 8
+        sections.append((column, typecode, length, offset))
+        offset += length * array(typecode).itemsize
+    return sections
+
+
+class MappedSuperBlock(SuperBlock):
+    """A SuperBlock read straight out of a file written by SuperBlock.save
+
+    The file is memory mapped read-only and every column is a memoryview
+    over it, so opening costs the same whatever the size of the tree; pages
+    are only read in as lookups touch them. Child lookups bisect the CSR
+    children sorted by name instead of a dict, names are decoded from the
+    blob as needed. Listings keep the order the children were added in.
+
+    The type and name indexes are built on first use. The first change to
+    the tree copies everything into ordinary columns and turns this object
+    into a plain SuperBlock, the file itself is never written to.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, byteorder, inodes, names, blob, children, freed = (
+            SUPERBLOCK_HEADER.unpack_from(self._mmap)
         )
+        if magic != SUPERBLOCK_MAGIC:
+            raise ValueError(f"{path} isn't a saved SuperBlock")
+        if byteorder.rstrip(b"\0").decode() != sys.byteorder:
+            raise ValueError(f"{path} was saved on a {byteorder.decode()} endian machine")
 
-    def add_inode(self, inode):
-        self.inodes.append(inode)
-        return inode
+        buffer = memoryview(self._mmap)
+        for column, typecode, length, offset in _superblock_sections(
+            inodes, names, blob, children
+        ):
+            size = length * array(typecode).itemsize
+            setattr(self, column, buffer[offset : offset + size].cast(typecode))
+
+        self.freed = freed
+        self._size_index = None
+        self.path_ids = {}
+        self.root = self.inode(ROOT_ID)
+
+    def __repr__(self):
+        return f"mapped_super_block({len(self)} inodes)"
 
+    def _name_bytes(self, inode_id: int) -> bytes:
+        name_id = self.names[inode_id]
+        return self.name_blob[self.name_offsets[name_id] : self.name_offsets[name_id + 1]].tobytes()
 
-class Path(list):
-    """Describes list of inodes present in path to file
+    def name(self, inode_id: int) -> str:
+        return self._name_bytes(inode_id).decode()
+
+    def child(self, parent_id: int, name: str):
+        start, stop = self.child_offsets[parent_id], self.child_offsets[parent_id + 1]
+        target = name.encode()
+        by_name = self.children_by_name
+        position = bisect_left(by_name, target, start, stop, key=self._name_bytes)
+        if position < stop and self._name_bytes(by_name[position]) == target:
+            return by_name[position]
+        return None
+
+    def child_list(self, inode_id: int) -> list:
+        if self.types[inode_id] != DIR:
+            return []
+        return self.children[self.child_offsets[inode_id] : self.child_offsets[inode_id + 1]].tolist()
+
+    @property
+    def name_table(self) -> list:
+        if "_name_table" not in self.__dict__:
+            self._name_table = [
+                sys.intern(self.name_blob[start:stop].tobytes().decode())
+                for start, stop in zip(self.name_offsets, self.name_offsets[1:])
+            ]
+        return self._name_table
+
+    @property
+    def name_ids(self) -> dict:
+        if "_name_ids" not in self.__dict__:
+            self._name_ids = {name: name_id for name_id, name in enumerate(self.name_table)}
+        return self._name_ids
+
+    @property
+    def name_index(self) -> list:
+        if "_name_index" not in self.__dict__:
+            self._name_index = [array("q") for _ in range(len(self.name_offsets) - 1)]
+            for inode_id, name_id in enumerate(self.names):
+                if self.types[inode_id] != FREE:
+                    self._name_index[name_id].append(inode_id)
+        return self._name_index
+
+    @property
+    def type_index(self) -> dict:
+        if "_type_index" not in self.__dict__:
+            self._type_index = {DIR: array("q"), FILE: array("q")}
+            for inode_id, type_code in enumerate(self.types):
+                if type_code != FREE:
+                    self._type_index[type_code].append(inode_id)
+        return self._type_index
+
+    def thaw(self):
+        """Copies the mapped columns into memory and becomes a plain SuperBlock"""
+        logger.debug("thaw - copying %s mapped inodes into memory", len(self.types))
+        columns = {
+            column: array(typecode, getattr(self, column).tobytes())
+            for column, typecode in (
+                ("parents", "q"),
+                ("sizes", "q"),
+                ("file_sizes", "q"),
+                ("types", "b"),
+                ("names", "i"),
+            )
+        }
+        name_table, name_ids = self.name_table, self.name_ids
+        type_index, name_index = self.type_index, self.name_index
+        child_ids = [
+            {self.name(child_id): child_id for child_id in self.child_list(inode_id)}
+            if type_code == DIR
+            else None
+            for inode_id, type_code in enumerate(self.types)
+        ]
+
+        # dropping the views unmaps the file once nothing else points into it
+        self.__class__ = SuperBlock
+        self.__dict__ = {
+            **columns,
+            "name_table": name_table,
+            "name_ids": name_ids,
+            "child_ids": child_ids,
+            "type_index": type_index,
+            "name_index": name_index,
+            "freed": self.freed,
+            "_size_index": self._size_index,
+            "path_ids": self.path_ids,
+        }
+        self.root = self.inode(ROOT_ID)
+        return self
+
+    def intern(self, name: str) -> int:
+        return self.thaw().intern(name)
+
+    def add_inode(self, *args, **kwargs) -> Inode:
+        return self.thaw().add_inode(*args, **kwargs)
+
+    def invalidate_sizes(self):
+        self.thaw().invalidate_sizes()
+
+    def propagate_size(self, inode_id: int, delta: int):
+        self.thaw().propagate_size(inode_id, delta)
+
+    def resize(self, inode, size: int):
+        self.thaw().resize(inode, size)
+
+    def remove(self, inode):
+        self.thaw().remove(inode)
+
+
+def subtree_sizes(parents, sizes, types):
+    """Recursive size of every inode, and the size of files directly in each
+
+    Takes the columns of a whole tree at once instead of walking up from
+    each file. Only file sizes are read, directory entries are recomputed.
+    Files are added onto their parent first, leaving only the directories
+    to roll up. With NumPy they're grouped by depth (found by pointer
+    jumping) and each level is added onto its parents with one np.add.at,
+    deepest level first. Without it, parents always have smaller ids than
+    their children, so one pass in reverse id order does the same.
 
     Args:
-        list (_type_): subclass of list
+        parents: inode id -> parent inode id, NO_PARENT for the root and freed inodes
+        sizes: inode id -> size, only read for files
+        types: inode id -> DIR, FILE or FREE
+
+    Returns:
+        tuple[array, array]: inode id -> recursive size, inode id -> size of files directly inside
     """
+    if np is None:
+        file_sizes = array("q", bytes(8 * len(types)))
+        for inode_id, type_code in enumerate(types):
+            if type_code == FILE:
+                file_sizes[parents[inode_id]] += sizes[inode_id]
+        totals = array("q", file_sizes)
+        for inode_id in range(len(types) - 1, 0, -1):
+            if types[inode_id] == FILE:
+                totals[inode_id] = sizes[inode_id]
+            elif types[inode_id] == DIR:
+                totals[parents[inode_id]] += totals[inode_id]
+        return totals, file_sizes
+
+    parents = np.frombuffer(parents, dtype=np.int64)
+    types = np.frombuffer(types, dtype=np.int8)
+    sizes = np.frombuffer(sizes, dtype=np.int64)
+    file_ids = np.flatnonzero(types == FILE)
+    dir_ids = np.flatnonzero(types == DIR)
+
+    file_sizes = np.zeros(len(types), dtype=np.int64)
+    np.add.at(file_sizes, parents[file_ids], sizes[file_ids])
+    totals = file_sizes.copy()
+
+    # depth[i] is the distance from i to jump[i], doubling the jump each round
+    depth = (parents != NO_PARENT).astype(np.int64)
+    jump = parents.copy()
+    active = dir_ids[jump[dir_ids] != NO_PARENT]
+    while active.size:
+        up = jump[active]
+        depth[active] += depth[up]
+        jump[active] = jump[up]
+        active = active[jump[active] != NO_PARENT]
+
+    dir_depths = depth[dir_ids]
+    by_depth = dir_ids[np.argsort(dir_depths)]
+    level_ends = np.cumsum(np.bincount(dir_depths))
+    for level in range(len(level_ends) - 1, 0, -1):
+        ids = by_depth[level_ends[level - 1] : level_ends[level]]
+        np.add.at(totals, parents[ids], totals[ids])
+    totals[file_ids] = sizes[file_ids]
+    return array("q", totals.tobytes()), array("q", file_sizes.tobytes())
+
+
+class SizeIndex:
+    """Snapshot of every directory's size, in ascending order
+
+    Built once in O(n log n), after which threshold, range-sum and
+    lower-bound queries are bisects over the sorted sizes and their prefix
+    sums, O(log n) each. Directories of equal size stay in inode id order.
+    """
+
+    def __init__(self, filesystem: SuperBlock):
+        dir_ids = [
+            inode_id
+            for inode_id in filesystem.type_index[DIR]
+            if filesystem.types[inode_id] == DIR
+        ]
+        dir_ids.sort(key=filesystem.sizes.__getitem__)
+        self.ids = array("q", dir_ids)
+        self.sizes = array("q", (filesystem.sizes[inode_id] for inode_id in dir_ids))
+        self.prefix_sums = array("q", accumulate(self.sizes, initial=0))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _bounds(self, low=None, high=None):
+        """Positions of the first and past-the-last size within [low, high]"""
+        start = 0 if low is None else bisect_left(self.sizes, low)
+        stop = len(self.sizes) if high is None else bisect_right(self.sizes, high)
+        return start, max(start, stop)
 
-    def __init__(self, path=[]):
+    def between(self, low=None, high=None) -> array:
+        """Ids of directories with low <= size <= high, smallest first"""
+        start, stop = self._bounds(low, high)
+        return self.ids[start:stop]
+
+    def count(self, low=None, high=None) -> int:
+        start, stop = self._bounds(low, high)
+        return stop - start
+
+    def total(self, low=None, high=None) -> int:
+        """Sum of the sizes of directories with low <= size <= high"""
+        start, stop = self._bounds(low, high)
+        return self.prefix_sums[stop] - self.prefix_sums[start]
+
+    def smallest_at_least(self, target: int, ignore_root: bool = True):
+        """Id of the smallest directory with size >= target, or None"""
+        position = bisect_left(self.sizes, target)
+        while position < len(self.ids):
+            if not (ignore_root and self.ids[position] == ROOT_ID):
+                return self.ids[position]
+            position += 1
+        return None
+
+
+class Path(tuple):
+    """Describes the names of the inodes present in path to file
+
+    Immutable and interned: building the same path twice hands back the same
+    object, with its hash and string form worked out once at creation. That
+    makes comparisons, dict lookups and printing O(1) afterwards.
+
+    Args:
+        tuple (_type_): subclass of tuple
+    """
+
+    # interned paths, keyed by their components and by the strings they were parsed from
+    _interned = {}
+    _parsed = {}
+    INTERN_LIMIT = 1 << 16
+
+    def __new__(cls, path=()):
         """generate a path object.
-        If path is a string, it will be split on '/' and converted to a list.
+        If path is a string, it will be split on '/' and converted to a tuple.
         Ensures the path does not contain spaces.
-        An empty list represents the root directory.
+        An empty path represents the root directory.
 
         Args:
-            path (list, optional): list of inodes. Defaults to [].
+            path (str | Iterable[str] | Inode, optional): the path. Defaults to ().
 
         Raises:
-            ValueError: _description_
+            ValueError: raised when a component contains a space
         """
-        if " " in path:
+        if isinstance(path, Path):
+            return path
+        if isinstance(path, Inode):
+            return path.path
+        if isinstance(path, str):
+            parsed = cls._parsed.get(path)
+            if parsed is not None:
+                return parsed
+            source = path
+            components = ["/"] if path == "/" else path.split("/")
+        else:
+            source = None
+            components = list(path)
+
+        if any(" " in component for component in components):
             raise ValueError(f"Path cannot contain spaces: {path}")
 
-        if isinstance(path, list):
-            pass
-        elif isinstance(path, Path):
-            path = path.copy()
-        elif isinstance(path, Inode):
-            path = path.path.copy()
-        elif path == "/":
-            path = ["/"]
-        elif isinstance(path, str):
-            path = path.split("/")
-
-        # ensure the first empty element is a slash
-        if path:
-            if path[0] == "":
-                path[0] = "/"
-
-        # lastly remove all empty strings
-        path = [node for node in path if node != ""]
-        super().__init__(path)
+        # ensure the first empty element is a slash, then drop all empty strings
+        if components and components[0] == "":
+            components[0] = "/"
+        components = tuple(sys.intern(node) for node in components if node != "")
+
+        self = cls._interned.get(components)
+        if self is None:
+            if len(cls._interned) >= cls.INTERN_LIMIT:
+                cls._interned.clear()
+                cls._parsed.clear()
+            self = super().__new__(cls, components)
+            self._hash = tuple.__hash__(self)
+            if not components or components == ("/",):
+                self._str = "/"
+            elif components[0] == "/":
+                self._str = "/" + "/".join(components[1:])
+            else:
+                self._str = "/".join(components)
+            cls._interned[components] = self
+        if source is not None:
+            cls._parsed[source] = self
+        return self
+
+    def __hash__(self):
+        return self._hash
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+        if isinstance(other, Path) and self._hash != other._hash:
+            return False
+        return tuple.__eq__(self, other)
+
+    def __ne__(self, other):
+        return not self == other
 
     def __str__(self):
-        path = self
-        if self == []:
-            path = "/"
-        else:
-            # join the parts, removing any duplicate slashes
-            # I tried a regex here like so:
-            #    path = re.sub(r"(.)\1{2,}", r"\1\1", path)
-            # But extra slashes remained, dont know why.
-            path = "/".join(self)
-            path = path.replace("///", "/")
-            path = path.replace("//", "/")
-        return path
+        return self._str
+
+    def __repr__(self):
+        return f"Path({self._str!r})"
 
     def abspath(self):
-        return Path(str(self))
+        return self
 
 
 class Bash:
@@ -197,25 +1058,37 @@ class Bash:
         if not path:
             path = self.pwd
         logger.debug(
-            f"ls - looking up files in {str(path)}{', recursively' if recursive else ''}"
+            "ls - looking up files in %s%s", path, ", recursively" if recursive else ""
         )
         if isinstance(path, str):
             path = self.find(path)
-        found_inodes = self.filesystem.find_inodes({"path": path.abspath})
+        found_inodes = self.listing(path.id)
         if recursive:
-            for node in found_inodes:
-                if node.inode_type == "dir":
-                    found_inodes.extend(self.ls(node.abspath, recursive=True))
-        if not recursive:
-            logger.info(
-                f"  nodes found': {[(str(node), node.size) for node in found_inodes]}"
+            # breadth first, each directory's children are queued behind it
+            pending = deque(node for node in found_inodes if node.inode_type == "dir")
+            while pending:
+                children = self.listing(pending.popleft().id)
+                found_inodes.extend(children)
+                pending.extend(node for node in children if node.inode_type == "dir")
+        if not recursive and logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "  nodes found': %s", [(str(node), node.size) for node in found_inodes]
             )
 
         return found_inodes
 
+    def listing(self, inode_id: int) -> list:
+        """Inodes directly inside inode_id, biggest first as find_inodes orders them"""
+        filesystem = self.filesystem
+        child_ids = filesystem.child_list(inode_id)
+        child_ids.sort(
+            key=lambda child_id: (-filesystem.sizes[child_id], filesystem.types[child_id])
+        )
+        return [filesystem.inode(child_id) for child_id in child_ids]
+
     def cd(self, path=None):
         self.oldpwd = self.pwd
-        logger.info(f"changing from {self.oldpwd.abspath} to {path}")
+        logger.debug("changing from %s to %s", self.oldpwd, path)
         match path:
             case None | "/":
                 self.pwd = self.filesystem.root
@@ -223,58 +1096,80 @@ class Bash:
                 if self.pwd.name == "/":
                     self.pwd = self.filesystem.root
                 else:
-                    self.pwd = self.find(self.pwd.path)
+                    parent_id = self.filesystem.parents[self.pwd.id]
+                    self.pwd = self.filesystem.inode(parent_id)
             case "-":
                 self.pwd = self.oldpwd
+            case _ if "/" not in path:
+                child_id = self.filesystem.child(self.pwd.id, path)
+                if child_id is None:
+                    raise ValueError(f"{self.pwd.abspath}/{path} not found")
+                self.pwd = self.filesystem.inode(child_id)
             case _:
-                self.pwd = self.find(str(self.pwd.abspath) + "/" + path)
+                self.pwd = self.find(self.resolve(path))
         return self.pwd
 
+    def resolve(self, path):
+        """Absolute form of a path relative to the working directory"""
+        if str(path).startswith("/"):
+            return path
+        return str(self.pwd.abspath) + "/" + path
+
     def pwd(self):
         print(self.pwd.name)
         return self
 
     def mkdir(self, dir_name):
-        logger.info(f"mkdir - Creating dir inode: {dir_name}")
-        inode = DirInode(self.pwd.abspath, dir_name)
-        if self.filesystem.find_inodes({"path": inode.abspath}):
+        logger.debug("mkdir - Creating dir inode: %s", dir_name)
+        if self.filesystem.child(self.pwd.id, dir_name) is not None:
             raise ValueError(f"Directory {dir_name} already exists")
-        self.filesystem.add_inode(inode)
+        self.filesystem.add_inode(self.pwd, dir_name, "dir")
         return self
 
     def touch(self, file_name, size=0, update_dir_size=True):
-        logger.info(f"touch - Creating file inode: {file_name}")
-        inode = self.filesystem.add_inode(FileInode(self.pwd.abspath, file_name, size))
+        logger.debug("touch - Creating file inode: %s", file_name)
+        self.filesystem.add_inode(
+            self.pwd, file_name, "file", size, update_dir_size=update_dir_size
+        )
+        return self
+
+    def truncate(self, path, size):
+        logger.debug("truncate - Resizing %s to %s", path, size)
+        self.filesystem.resize(self.find(self.resolve(path)), size)
+        return self
 
-        if update_dir_size:
-            # Update dir size of parent, recursively
-            def _update_dir_size(child_inode):
-                dir_inode = self.find(child_inode.path)
-                dir_inode.size += size
-                if dir_inode is not self.filesystem.root:
-                    _update_dir_size(dir_inode)
+    def rm(self, path):
+        logger.debug("rm - Removing %s", path)
+        inode = self.find(self.resolve(path))
+        parent = self.filesystem.inode(self.filesystem.parents[inode.id])
 
-            _update_dir_size(inode)
+        def _inside(inode_id):
+            while inode_id not in (NO_PARENT, inode.id):
+                inode_id = self.filesystem.parents[inode_id]
+            return inode_id == inode.id
 
+        # don't leave the shell sitting in a directory that no longer exists
+        if _inside(self.pwd.id):
+            self.pwd = parent
+        if _inside(self.oldpwd.id):
+            self.oldpwd = parent
+        self.filesystem.remove(inode)
         return self
 
     def du(self, path=None, recursive=False):
         # Determine Path, sanitize input
         if path is None:
             path = str(self.pwd)
-        # Gather sizes, recursively if all=True
+        # Sizes are maintained as the filesystem changes, nothing is summed here
         logger.debug(
-            f"du - Calculating size of {str(path)} {', recursively' if recursive else ''})"
+            "du - Calculating size of %s %s)", path, ", recursively" if recursive else ""
         )
-        total_size = 0
-        inodes = self.ls(path)
-        if recursive:
-            total_size += sum([inode.size for inode in inodes])
+        inode = self.find(path)
+        if recursive or inode.inode_type == "file":
+            total_size = self.filesystem.sizes[inode.id]
         else:
-            total_size += sum(
-                [inode.size for inode in inodes if inode.inode_type == "file"]
-            )
-        logger.debug(f"du - Total size: {total_size} bytes")
+            total_size = self.filesystem.file_sizes[inode.id]
+        logger.debug("du - Total size: %s bytes", total_size)
 
         return total_size
 
@@ -290,10 +1185,85 @@ class Bash:
         Returns:
             Inode: a single Inode object
         """
-        try:
-            inode = self.filesystem.find_inodes(
-                {"abspath": abspath}, ignore_root=False
-            )[0]
-        except (ValueError, IndexError):
+        inode = self.filesystem.get(abspath)
+        if inode is None:
             raise ValueError(f"{abspath} not found")
         return inode
+
+
+@dataclass
+class Command:
+    line_number: int
+    name: str
+    arg: Optional[str] = None
+
+
+@dataclass
+class DirEntry:
+    line_number: int
+    name: str
+
+
+@dataclass
+class FileEntry:
+    line_number: int
+    name: str
+    size: int
+
+
+def read_transcript(lines: Iterable[str]) -> Iterator[Union[Command, DirEntry, FileEntry]]:
+    """Yields a typed event for each line of a terminal transcript
+
+    Only one line is held at a time, so lines can be an open file or
+    sys.stdin no matter how large the transcript is.
+
+    Args:
+        lines (Iterable[str]): transcript lines, with or without newlines
+
+    Raises:
+        ValueError: raise if a line is neither a command nor ls output
+    """
+    for line_number, line in enumerate(lines):
+        line = line.rstrip("\n")
+        if not line:
+            continue
+        line_items = line.split(" ")
+        match line_items:
+            case ["$", name]:
+                yield Command(line_number, name)
+            case ["$", name, arg]:
+                yield Command(line_number, name, arg)
+            case ["dir", name]:
+                yield DirEntry(line_number, name)
+            case [size, name] if size.isdigit():
+                yield FileEntry(line_number, name, int(size))
+            case _:
+                raise ValueError(f"Failed to parse line {line_number}: {line}")
+
+
+def replay(
+    bash: Bash, events: Iterable[Union[Command, DirEntry, FileEntry]], bulk: bool = False
+) -> Bash:
+    """Feeds transcript events into bash as they arrive
+
+    With bulk, files don't update the directories above them as they're
+    added; all directory sizes are computed once the transcript ends.
+    """
+    for event in events:
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("%s %s", bash.prompt, event)
+        match event:
+            case Command(name="cd"):
+                bash.cd(event.arg)
+            case Command(name="ls"):
+                # the entries that follow are the listing, nothing to look up
+                pass
+            case DirEntry():
+                bash.mkdir(event.name)
+            case FileEntry():
+                bash.touch(event.name, event.size, update_dir_size=not bulk)
+            case _:
+                raise ValueError(f"Unknown event: {event}")
+    if bulk:
+        bash.filesystem.recompute_sizes()
+    return bash
@@ -30,136 +30,516 @@
 import os
 import sys
 import logging
+import heapq
+from array import array
+from collections.abc import Sequence
 from math import prod
 
-logger = logging.getLogger("logger")
-logger.setLevel(logging.INFO)
-handler = logging.StreamHandler(sys.stdout)
-formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
-handler.setFormatter(formatter)
-logger.addHandler(handler)
+logger = logging.getLogger(__name__)
 PUZZLE_INPUT = f"{os.path.dirname(os.path.realpath(__file__))}/puzzle_input.txt"
 
 
-def parse_input():
-    with open(PUZZLE_INPUT, "r") as f:
-        lines = f.readlines()
-    return lines
+DIRECTIONS = {"left": (-1, 0), "right": (1, 0), "up": (0, -1), "down": (0, 1)}
+
+# a tree's visibility mask, a bit per direction it's visible from
+DIRECTION_BITS = {direction: 1 << bit for bit, direction in enumerate(DIRECTIONS)}
+CHECKED = 1 << len(DIRECTIONS)  # its viewing distances have been worked out
+
+DIGITS = bytes.maketrans(b"0123456789", bytes(range(10)))
+
+FILTERS = {
+    "$lt": lambda value, bound: value < bound,
+    "$gt": lambda value, bound: value > bound,
+    "$lte": lambda value, bound: value <= bound,
+    "$gte": lambda value, bound: value >= bound,
+}
+
+
+def sweep(heights):
+    """Looks back along a line of heights from each tree in turn
+
+    The running maximum says whether a tree is taller than everything before
+    it, i.e. visible from the start of the line. A stack of the trees not yet
+    overshadowed (heights never increasing from bottom to top) holds the
+    nearest tree at least as tall on top, once the shorter ones are popped,
+    which is where the view back stops. Each tree is pushed and popped once.
+
+    Returns:
+        tuple[list, list]: visible from the start, viewing distance towards it
+    """
+    visible, distances, blockers = [], [], []
+    tallest = -1
+    for position, height in enumerate(heights):
+        visible.append(height > tallest)
+        tallest = max(tallest, height)
+        while blockers and heights[blockers[-1]] < height:
+            blockers.pop()
+        distances.append(position - blockers[-1] if blockers else position)
+        blockers.append(position)
+    return visible, distances
+
+
+def survey_heights(rows):
+    """Visibility and viewing distance of every tree, from four linear sweeps
+
+    Args:
+        rows (list[list[int]]): tree heights, row by row
+
+    Returns:
+        tuple[dict, dict]: direction -> matrix of visible from that edge,
+            direction -> matrix of viewing distances that way
+    """
+    height, width = len(rows), len(rows[0])
+    visible = {direction: [None] * height for direction in DIRECTIONS}
+    distance = {direction: [None] * height for direction in DIRECTIONS}
+    for y, row in enumerate(rows):
+        visible["left"][y], distance["left"][y] = sweep(row)
+        seen, distances = sweep(row[::-1])
+        visible["right"][y], distance["right"][y] = seen[::-1], distances[::-1]
+
+    columns = {direction: [] for direction in DIRECTIONS}
+    for x in range(width):
+        column = [row[x] for row in rows]
+        columns["up"].append(sweep(column))
+        seen, distances = sweep(column[::-1])
+        columns["down"].append((seen[::-1], distances[::-1]))
+    # the column sweeps are transposed back into rows
+    for direction in ("up", "down"):
+        seen, distances = zip(*columns[direction])
+        visible[direction] = [list(row) for row in zip(*seen)]
+        distance[direction] = [list(row) for row in zip(*distances)]
+    return visible, distance
+
+
+class SparseMax:
+    """Range maximum over a line of heights in O(1), from a sparse table
+
+    levels[k][i] is the tallest of heights[i : i + 2**k], so any range is
+    covered by two overlapping spans of the largest power of two that fits.
+    """
+
+    def __init__(self, heights):
+        self.levels = [list(heights)]
+        span = 1
+        while span * 2 <= len(heights):
+            previous = self.levels[-1]
+            self.levels.append(
+                [max(previous[i], previous[i + span]) for i in range(len(previous) - span)]
+            )
+            span *= 2
+
+    def __len__(self):
+        return len(self.levels[0])
+
+    def max(self, start, stop):
+        """Tallest of heights[start:stop], -1 for an empty range"""
+        if start >= stop:
+            return -1
+        level = (stop - start).bit_length() - 1
+        heights = self.levels[level]
+        return max(heights[start], heights[stop - (1 << level)])
+
+    def last_at_least(self, position, height):
+        """Nearest position before this one at least height tall, None if there isn't one"""
+        low, high = 0, position
+        if self.max(low, high) < height:
+            return None
+        # the range low:high always holds one, halved until it's a single tree
+        while high - low > 1:
+            middle = (low + high) // 2
+            if self.max(middle, high) >= height:
+                low = middle
+            else:
+                high = middle
+        return low
+
+    def first_at_least(self, position, height):
+        """Nearest position after this one at least height tall, None if there isn't one"""
+        low, high = position + 1, len(self)
+        if self.max(low, high) < height:
+            return None
+        while high - low > 1:
+            middle = (low + high) // 2
+            if self.max(low, middle) >= height:
+                high = middle
+            else:
+                low = middle
+        return low
+
+
+class ScenicIndex:
+    """Point queries on the visibility and scenic scores of a grid of heights
+
+    Keeps survey_heights' matrices, so what a tree can see is a lookup, and a
+    SparseMax per row and column, so nearest blockers take O(log n) and what
+    would change if a tree had another height O(1) per tree in its row and
+    column. Changing a height only sweeps that tree's row and column again.
+    """
+
+    def __init__(self, rows):
+        self.rows = [list(row) for row in rows]
+        self.visible, self.distance = survey_heights(self.rows)
+        self.row_max = [SparseMax(row) for row in self.rows]
+        self.column_max = [SparseMax(column) for column in zip(*self.rows)]
+
+    def __repr__(self):
+        return f"ScenicIndex(x={len(self.rows[0])}, y={len(self.rows)})"
+
+    def height(self, x, y):
+        return self.rows[y][x]
+
+    def visible_from(self, x, y):
+        """Directions the tree can be seen from, as Tree.visible_from"""
+        return [direction for direction in DIRECTIONS if self.visible[direction][y][x]]
+
+    def viewing_distances(self, x, y):
+        """Trees seen in each direction, as Tree.visibility"""
+        return {direction: self.distance[direction][y][x] for direction in DIRECTIONS}
+
+    def scenic_score(self, x, y):
+        return prod(self.distance[direction][y][x] for direction in DIRECTIONS)
+
+    def nearest_blocker(self, x, y, direction, height=None):
+        """(x, y) of the nearest tree that way at least height tall, by default the
+        tree's own height, so the tree its view stops at. None if the edge is reached
+        """
+        height = self.rows[y][x] if height is None else height
+        if direction in ("left", "right"):
+            table, position = self.row_max[y], x
+        else:
+            table, position = self.column_max[x], y
+        if direction in ("left", "up"):
+            found = table.last_at_least(position, height)
+        else:
+            found = table.first_at_least(position, height)
+        if found is None:
+            return None
+        return (found, y) if direction in ("left", "right") else (x, found)
+
+    def newly_visible(self, x, y, height):
+        """Trees that would become visible from outside if (x, y) were height tall
+
+        Only the trees in its row and column can be affected. Each is checked
+        against the tallest trees between it and the edges, from the range
+        maxima either side of (x, y), so nothing is changed or swept.
+
+        Returns:
+            list[tuple]: (x, y) of the trees, itself then its row then its column
+        """
+
+        def tallest(table, start, stop, position):
+            # tallest in start:stop, with the tree at position at the new height
+            if not start <= position < stop:
+                return table.max(start, stop)
+            return max(table.max(start, position), height, table.max(position + 1, stop))
+
+        def seen(table, position, other, tall):
+            # from either end of the line, past everything between
+            return tallest(table, 0, other, position) < tall or (
+                tallest(table, other + 1, len(table), position) < tall
+            )
+
+        row, column = self.row_max[y], self.column_max[x]
+        found = []
+        if not self.visible_from(x, y) and (
+            seen(row, x, x, height) or seen(column, y, y, height)
+        ):
+            found.append((x, y))
+        for other in range(len(row)):
+            if other != x and not self.visible_from(other, y):
+                if seen(row, x, other, self.rows[y][other]):
+                    found.append((other, y))
+        for other in range(len(column)):
+            if other != y and not self.visible_from(x, other):
+                if seen(column, y, other, self.rows[other][x]):
+                    found.append((x, other))
+        return found
+
+    def set_height(self, x, y, height):
+        """Changes a tree's height, sweeping only its row and column again"""
+        logger.debug("set_height - (%s, %s) from %s to %s", x, y, self.rows[y][x], height)
+        self.rows[y][x] = height
+        row = self.rows[y]
+        self.row_max[y] = SparseMax(row)
+        self.visible["left"][y], self.distance["left"][y] = sweep(row)
+        seen, distances = sweep(row[::-1])
+        self.visible["right"][y], self.distance["right"][y] = seen[::-1], distances[::-1]
+
+        column = [heights[x] for heights in self.rows]
+        self.column_max[x] = SparseMax(column)
+        up = sweep(column)
+        down = [results[::-1] for results in sweep(column[::-1])]
+        for direction, (seen, distances) in (("up", up), ("down", down)):
+            for position, (visible, distance) in enumerate(zip(seen, distances)):
+                self.visible[direction][position][x] = visible
+                self.distance[direction][position][x] = distance
+        return self
 
 
 class Forest:
+    """Grid of trees, stored row by row so (x, y) is at trees[y * width + x]
+
+    Rather than an object per tree, each attribute is a column (an array)
+    with an entry per tree, and trees are Tree views made as they're asked
+    for: a byte of height, a byte of CHECKED and direction bits, a small int
+    per viewing distance and the scenic score once surveyed.
+    """
+
     def __init__(self, lines):
-        self.trees = []
+        self.surveyed = False
+        self.scenic_index = None
+        lines = [line.rstrip() for line in lines if line.strip()]
         self.size = {"x": len(lines[0]), "y": len(lines)}
-        for y, line in enumerate(lines):
-            line = line.rstrip()
-            for x, char in enumerate(line):
-                self.trees.append(Tree(x, y, int(char)))
+        count = self.size["x"] * self.size["y"]
+        self.heights = array("B", "".join(lines).encode().translate(DIGITS))
+        self.visible = array("B", [0]) * count
+        # distances fit in two bytes unless the forest is wider or deeper than that
+        self.distance_type = "H" if max(self.size.values()) < 1 << 16 else "I"
+        self.distances = {
+            direction: array(self.distance_type, [0]) * count for direction in DIRECTIONS
+        }
+        self.scores = array("Q")
+        self.trees = Trees(self)
 
     def __repr__(self):
         return f"Forest(trees={len(self.trees)})"
 
+    def survey(self):
+        """Check the visibility of every tree, only the first time it's called
+
+        Gives the same answer as check_visbility on each tree, but from a
+        sweep each way along every row and column, so it's linear in the
+        number of trees. Each line's results go straight into the columns,
+        so besides those only one line is held at a time.
+        """
+        if not self.surveyed:
+            width = self.size["x"]
+            self.visible = array("B", [CHECKED]) * len(self.heights)
+            for y in range(self.size["y"]):
+                self.sweep_line(slice(y * width, (y + 1) * width), ("left", "right"))
+            for x in range(width):
+                self.sweep_line(slice(x, None, width), ("up", "down"))
+            # scenic scores worked out once, in the same order as the trees
+            self.scores = self.line_scores()
+            self.surveyed = True
+        return self
+
+    def set_height(self, x, y, height):
+        """Changes the height of the tree at (x, y), keeping the survey and the index in step
+
+        Only the tree's row and column can see it, so only they are swept
+        again, into the visibility and distance columns and their scores.
+        Before the survey, those trees are marked unchecked instead.
+        """
+        index = self.tree_at(x, y).index
+        logger.debug("set_height - (%s, %s) from %s to %s", x, y, self.heights[index], height)
+        self.heights[index] = height
+        if self.scenic_index is not None:
+            self.scenic_index.set_height(x, y, height)
+        width = self.size["x"]
+        lines = {
+            ("left", "right"): slice(y * width, (y + 1) * width),
+            ("up", "down"): slice(x, None, width),
+        }
+        for directions, line in lines.items():
+            if self.surveyed:
+                self.sweep_line(line, directions)
+                self.scores[line] = self.line_scores(line)
+            else:
+                self.visible[line] = array("B", [0]) * len(self.visible[line])
+        return self
+
+    def sweep_line(self, line, directions):
+        """Sweeps the trees of a row or column (a slice of the columns) both ways
+
+        Args:
+            line (slice): the trees of the row or column, in order
+            directions (tuple): the directions looking back to its start and to its end
+        """
+        heights = self.heights[line]
+        towards_start, towards_end = directions
+        seen, distances = sweep(heights)
+        seen_back, distances_back = sweep(heights[::-1])
+        self.distances[towards_start][line] = array(self.distance_type, distances)
+        self.distances[towards_end][line] = array(self.distance_type, reversed(distances_back))
+        start_bit, end_bit = DIRECTION_BITS[towards_start], DIRECTION_BITS[towards_end]
+        self.visible[line] = array(
+            "B",
+            (
+                mask & ~(start_bit | end_bit) | start_bit * start | end_bit * end
+                for mask, start, end in zip(self.visible[line], seen, reversed(seen_back))
+            ),
+        )
+
+    def line_scores(self, line=None):
+        """Scenic scores of a slice of the trees, all of them by default, from the distances"""
+        columns = (
+            self.distances[direction] if line is None else self.distances[direction][line]
+            for direction in DIRECTIONS
+        )
+        scores = map(prod, zip(*columns))
+        return array("Q", scores) if self.distance_type == "H" else list(scores)
+
+    def height_rows(self):
+        """Tree heights row by row, as survey_heights and ScenicIndex take them"""
+        width = self.size["x"]
+        return [self.heights[y * width : (y + 1) * width] for y in range(self.size["y"])]
+
+    def top_scenic(self, k=1):
+        """The k trees with the highest scenic scores, best first
+
+        Goes through the scores from survey keeping a heap of the k best so
+        far, rather than sorting every tree by its scenic_score property.
+
+        Returns:
+            list[tuple]: (scenic score, tree) pairs, ties in the order of the trees
+        """
+        self.survey()
+        best = heapq.nlargest(k, range(len(self.trees)), key=self.scores.__getitem__)
+        return [(self.scores[i], self.trees[i]) for i in best]
+
+    def index(self):
+        """ScenicIndex of the forest for point queries, built the first time it's called
+
+        set_height keeps it up to date. Changes made through the index itself
+        aren't reflected in the trees.
+        """
+        if self.scenic_index is None:
+            self.scenic_index = ScenicIndex(self.height_rows())
+        return self.scenic_index
+
+    def tree_at(self, x, y):
+        """The tree at (x, y), raises IndexError outside the forest"""
+        if not (0 <= x < self.size["x"] and 0 <= y < self.size["y"]):
+            raise IndexError(f"({x}, {y}) is outside the forest")
+        return self.trees[y * self.size["x"] + x]
+
+    def row(self, y):
+        return self.trees[y * self.size["x"] : (y + 1) * self.size["x"]]
+
+    def column(self, x):
+        return self.trees[x :: self.size["x"]]
+
+    def look(self, tree, direction):
+        """Trees in a straight line from tree to the edge, nearest first"""
+        dx, dy = DIRECTIONS[direction]
+        x, y = tree.x + dx, tree.y + dy
+        while 0 <= x < self.size["x"] and 0 <= y < self.size["y"]:
+            yield self.trees[y * self.size["x"] + x]
+            x, y = x + dx, y + dy
+
     def find_trees(self, filter_params={}):
-        logger.debug(f"Searching for trees with filter params: {filter_params}")
-
-        def _find_trees(tree_list, filter_params):
-            for item in tree_list:
-                if all(
-                    item.__dict__.get(key, None) == val
-                    for key, val in filter_params.items()
-                ):
-                    yield item
-
-        # detect dict in filter params
-        filter_param_dict = False
-        for key, value in filter_params.items():
-            if isinstance(value, dict):
-                filter_param_dict = True
-                break
-
-        # Find all the items that match the lt/gt filter
-        if filter_param_dict:
-            initial_found_items = []
-            for item in self.trees:
-                for sub_key, sub_value in value.items():
-                    if sub_key == "$lt":
-                        if item.__dict__[key] < sub_value:
-                            initial_found_items.append(item)
-                    elif sub_key == "$gt":
-                        if item.__dict__[key] > sub_value:
-                            initial_found_items.append(item)
-                    elif sub_key == "$lte":
-                        if item.__dict__[key] <= sub_value:
-                            initial_found_items.append(item)
-                    elif sub_key == "$gte":
-                        if item.__dict__[key] >= sub_value:
-                            initial_found_items.append(item)
-
-                    # Then remove dictionaries from the filter params
-                    filter_params = {
-                        key: value
-                        for key, value in filter_params.items()
-                        if not isinstance(value, dict)
-                    }
-
-        # Find all the items that match the remaining filter params
-        found_items = []
-        if filter_param_dict:
-            found_items = _find_trees(initial_found_items, filter_params)
+        """Trees matching every filter, in row order
+
+        Values are either compared for equality or a dict of $lt, $gt, $lte
+        and $gte bounds. An exact x and/or y only reads that column, row or
+        tree from the grid instead of scanning the whole forest.
+        """
+        logger.debug("Searching for trees with filter params: %s", filter_params)
+
+        x, y = filter_params.get("x"), filter_params.get("y")
+        if isinstance(x, int) and isinstance(y, int):
+            try:
+                candidates = [self.tree_at(x, y)]
+            except IndexError:
+                candidates = []
+        elif isinstance(y, int):
+            candidates = self.row(y) if 0 <= y < self.size["y"] else []
+        elif isinstance(x, int):
+            candidates = self.column(x) if 0 <= x < self.size["x"] else []
         else:
-            found_items = _find_trees(self.trees, filter_params)
-        return found_items
+            candidates = self.trees
+
+        def _matches(tree):
+            for key, value in filter_params.items():
+                attribute = getattr(tree, key, None)
+                if isinstance(value, dict):
+                    if not all(FILTERS[op](attribute, bound) for op, bound in value.items()):
+                        return False
+                elif attribute != value:
+                    return False
+            return True
+
+        return [tree for tree in candidates if _matches(tree)]
 
     def related_trees(self, tree):
-        logger.debug(f"Finding related trees for tree: {tree}")
-        related_trees = {"left": [], "right": [], "up": [], "down": []}
-        related_trees["left"] = self.find_trees({"y": tree.y, "x": {"$lt": tree.x}})
-        related_trees["right"] = self.find_trees({"y": tree.y, "x": {"$gt": tree.x}})
-        related_trees["up"] = self.find_trees({"x": tree.x, "y": {"$lt": tree.y}})
-        related_trees["down"] = self.find_trees({"x": tree.x, "y": {"$gt": tree.y}})
-
-        # Important to sort these to ensure closest tree is evaluated first
-        related_trees["left"] = sorted(
-            related_trees["left"], key=lambda x: x.x, reverse=True
-        )
-        related_trees["up"] = sorted(
-            related_trees["up"], key=lambda x: x.y, reverse=True
-        )
-        return related_trees
+        """Trees in each direction from tree, nearest first"""
+        logger.debug("Finding related trees for tree: %s", tree)
+        return {direction: list(self.look(tree, direction)) for direction in DIRECTIONS}
 
     def check_visbility(self, tree):
-        logger.debug(f"Checking visibility for tree: {tree}")
+        # checked once per tree rather than once per neighbour
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            logger.debug("Checking visibility for tree: %s", tree)
         visibile_from = ["left", "right", "up", "down"]
         visibility = {"left": 0, "right": 0, "up": 0, "down": 0}
-        related_trees = self.related_trees(tree)
-        for direction, trees in related_trees.items():
-            for related_tree in trees:
+        for direction in DIRECTIONS:
+            # stops at the first tree at least as tall, so at most one line is walked
+            for related_tree in self.look(tree, direction):
                 visibility[direction] += 1
-                logger.debug(
-                    f"{related_tree} visible from {tree}. Visibility count: {visibility[direction]}"
-                )
-                if related_tree.height >= tree.height:
+                if debug:
                     logger.debug(
-                        f"{tree} is not visible from {direction} due to {related_tree}"
+                        "%s visible from %s. Visibility count: %s",
+                        related_tree,
+                        tree,
+                        visibility[direction],
                     )
+                if related_tree.height >= tree.height:
+                    if debug:
+                        logger.debug(
+                            "%s is not visible from %s due to %s", tree, direction, related_tree
+                        )
                     visibile_from.remove(direction)
                     break
         tree.visible_from = visibile_from
         tree.visibility = visibility
-        logger.debug(
-            f"visibility for: {tree}, visible from: {tree.visible_from}, visibility: {tree.visibility}"
-        )
+        if debug:
+            logger.debug(
+                "visibility for: %s, visible from: %s, visibility: %s",
+                tree,
+                tree.visible_from,
+                tree.visibility,
+            )
         return tree
 
 
+class Trees(Sequence):
+    """A forest's trees row by row, as Tree views made when they're asked for"""
+
+    __slots__ = ("forest",)
+
+    def __init__(self, forest):
+        self.forest = forest
+
+    def __len__(self):
+        return len(self.forest.heights)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [Tree(self.forest, i) for i in range(len(self))[index]]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("tree index out of range")
+        return Tree(self.forest, index)
+
+    def __iter__(self):
+        return (Tree(self.forest, index) for index in range(len(self)))
+
+
 class Tree:
-    def __init__(self, x, y, height):
-        self.id = x + y
-        self.x: int = x
-        self.y: int = y
-        self.height: int = height
-        self.visible_from = []
-        self.visibility = {}
+    """One tree, read from and written to its forest's columns
+
+    Only the forest and the tree's place in it are kept, so two views of
+    the same place are equal without reading anything else.
+    """
+
+    __slots__ = ("forest", "index")
+
+    def __init__(self, forest, index):
+        self.forest = forest
+        self.index = index
 
     def __repr__(self):
         return f"Tree(x={self.x}, y={self.y}, height={self.height}, visible_from={self.visible_from}, visibility={self.visibility}, scenic_score={self.scenic_score})"
@@ -168,7 +548,13 @@ class Tree:
         return f"Tree(x={self.x}, y={self.y}, height={self.height}, visible_from={self.visible_from}, visibility={self.visibility}, scenic_score={self.scenic_score})"
 
     def __eq__(self, other):
-        return self.__dict__ == other.__dict__
+        if not isinstance(other, Tree):
+            return NotImplemented
+        if self.forest is other.forest and self.index == other.index:
+            return True
+        return (self.x, self.y, self.height, self.visible_from, self.visibility) == (
+            other.x, other.y, other.height, other.visible_from, other.visibility,
+        )
 
     def __gt__(self, other):
         return self.height > other.height
@@ -176,19 +562,73 @@ class Tree:
     def __lt__(self, other):
         return self.height < other.height
 
+    @property
+    def id(self):
+        return self.x + self.y
+
+    @property
+    def x(self):
+        return self.index % self.forest.size["x"]
+
+    @property
+    def y(self):
+        return self.index // self.forest.size["x"]
+
+    @property
+    def height(self):
+        return self.forest.heights[self.index]
+
+    @height.setter
+    def height(self, height):
+        # through the forest, so the trees that can see this one are swept again
+        self.forest.set_height(self.x, self.y, height)
+
+    @property
+    def visible_from(self):
+        mask = self.forest.visible[self.index]
+        return [direction for direction, bit in DIRECTION_BITS.items() if mask & bit]
+
+    @visible_from.setter
+    def visible_from(self, directions):
+        mask = self.forest.visible[self.index] & CHECKED
+        for direction in directions:
+            mask |= DIRECTION_BITS[direction]
+        self.forest.visible[self.index] = mask
+
+    @property
+    def visibility(self):
+        """Viewing distance in each direction, empty until they've been worked out"""
+        if not self.forest.visible[self.index] & CHECKED:
+            return {}
+        return {
+            direction: self.forest.distances[direction][self.index] for direction in DIRECTIONS
+        }
+
+    @visibility.setter
+    def visibility(self, visibility):
+        forest = self.forest
+        for direction, distance in visibility.items():
+            forest.distances[direction][self.index] = distance
+        forest.visible[self.index] |= CHECKED
+        if forest.surveyed:
+            # top_scenic reads the scores rather than the distances
+            forest.scores[self.index] = prod(
+                forest.distances[direction][self.index] for direction in DIRECTIONS
+            )
+
     @property
     def scenic_score(self):
         return prod(self.visibility.values())
 
 
-forest = Forest(parse_input())
-logger.info(f"forest: {forest}")
-for idx, tree in enumerate(forest.trees):
-    forest.trees[idx] = forest.check_visbility(tree)
+def parse(text):
+    return Forest(text.splitlines())
+
+
+def part1(forest):
+    # any direction bit set, straight from the column rather than a view per tree
+    return sum(1 for mask in forest.survey().visible if mask & ~CHECKED)
 
-print(
-    f"no. of visible trees: {len([tree for tree in forest.trees if tree.visible_from])}"
-)
 
 # --- Part Two ---
 # Content with the amount of tree cover available, the Elves just need to know the best spot to build their tree house: they would like to be able to see a lot of trees.
@@ -225,5 +665,22 @@ print(
 
 # Consider each tree on your map. What is the highest scenic score possible for any tree?
 
-most_scenic_tree = sorted(forest.trees, key=lambda x: x.scenic_score, reverse=True)[0]
-print(f"most scenic tree: {most_scenic_tree}")
+def find_most_scenic_tree(forest):
+    return forest.top_scenic(1)[0][1]
+
+
+def part2(forest):
+    return forest.top_scenic(1)[0][0]
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        stream=sys.stdout,
+    )
+    with open(PUZZLE_INPUT) as f:
+        forest = parse(f.read())
+    logger.info("forest: %s", forest)
+    print(f"no. of visible trees: {part1(forest)}")
+    print(f"most scenic tree: {find_most_scenic_tree(forest)}")
@@ -30,97 +30,133 @@
 import os
 import sys
 import logging
-from math import prod
+from dataclasses import dataclass
 import numpy as np
 
-logger = logging.getLogger("logger")
-logger.setLevel(logging.INFO)
-handler = logging.StreamHandler(sys.stdout)
-formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
-handler.setFormatter(formatter)
-logger.addHandler(handler)
+logger = logging.getLogger(__name__)
 PUZZLE_INPUT = f"{os.path.dirname(os.path.realpath(__file__))}/puzzle_input.txt"
 
+HEIGHTS = 10  # trees are a single digit tall
+
+# direction -> (view sweeping from that edge along rows, view turning results back)
+VIEWS = {
+    "left": (lambda matrix: matrix, lambda matrix: matrix),
+    "right": (lambda matrix: matrix[:, ::-1], lambda matrix: matrix[:, ::-1]),
+    "up": (lambda matrix: matrix.T, lambda matrix: matrix.T),
+    "down": (lambda matrix: matrix.T[:, ::-1], lambda matrix: matrix[:, ::-1].T),
+}
+
+
+def parse(text):
+    """Tree heights as a uint8 matrix, however big the map is"""
+    data = text.strip().encode() + b"\n"
+    width = data.index(b"\n")
+    rows = np.frombuffer(data, dtype=np.uint8).reshape(-1, width + 1)
+    return rows[:, :width] - ord("0")
+
+
+@dataclass
+class SweepState:
+    """What a sweep carries from one block of positions to the next
+
+    tallest is the tallest tree seen so far on each line (-1 before any),
+    blockers[h] the position of the last tree at least h tall on each line
+    (0, the edge, before any) and position the index of the next position.
+    """
+
+    tallest: np.ndarray
+    blockers: np.ndarray
+    position: int = 0
+
+    @classmethod
+    def start(cls, lines):
+        return cls(
+            np.full(lines, -1, dtype=np.int16), np.zeros((HEIGHTS, lines), dtype=np.int64)
+        )
+
+
+def sweep(heights, state=None, distances=True):
+    """Looks back along each row of heights, towards column 0
+
+    Visible means taller than the running maximum of the trees before it.
+    The viewing distance is the position minus the last tree before it at
+    least as tall, which is found for every height at once with a running
+    maximum of the positions of trees that tall, so HEIGHTS passes in all.
+    A block of columns can be passed at a time, carrying the state on to the
+    next block of the same rows, so the rows never have to be whole.
+
+    Args:
+        heights (np.ndarray): lines x positions, swept along the positions
+        state (SweepState, optional): from the previous block, None at the edge
+        distances (bool): skip the viewing distances (None) when only
+            visibility is wanted, leaving the blockers in the state as they were
+
+    Returns:
+        tuple: visible (bool), viewing distance (int64), state for the next block
+    """
+    lines, length = heights.shape
+    if state is None:
+        state = SweepState.start(lines)
+    heights = heights.astype(np.int16)
+    end = state.position + length
+    # int32 positions halve the memory traffic of the passes below
+    positions = np.arange(state.position, end, dtype=np.int32 if end < 2**31 else np.int64)
+
+    # column 0 of each buffer holds what was carried in from the previous block
+    running = np.empty((lines, length + 1), dtype=np.int16)
+    running[:, 0] = state.tallest
+    running[:, 1:] = heights
+    np.maximum.accumulate(running, axis=1, out=running)
+    visible = heights > running[:, :-1]
+    if not distances:
+        return visible, None, SweepState(running[:, -1], state.blockers, end)
+
+    # the last blocker before each tree, for the height of that tree
+    nearest = np.empty((lines, length), dtype=positions.dtype)
+    blockers = np.empty_like(state.blockers)
+    last = np.empty((lines, length + 1), dtype=positions.dtype)
+    for height in range(HEIGHTS):
+        last[:, 0] = state.blockers[height]
+        np.multiply(heights >= height, positions, out=last[:, 1:])
+        np.maximum.accumulate(last, axis=1, out=last)
+        np.copyto(nearest, last[:, :-1], where=heights == height)
+        blockers[height] = last[:, -1]
+    distance = (positions - nearest).astype(np.int64)
+
+    return visible, distance, SweepState(running[:, -1], blockers, end)
+
+
+def survey(heights, distances=True):
+    """Visibility and viewing distances of every tree, from all four edges
+
+    Each direction sweeps a flipped or transposed view of the heights, so
+    nothing is copied up front, and the results are turned back the same way.
+
+    Returns:
+        dict: direction -> (visible from that edge, viewing distance that way)
+    """
+    results = {}
+    for direction, (into, back) in VIEWS.items():
+        visible, distance, _ = sweep(into(heights), distances=distances)
+        results[direction] = (back(visible), None if distance is None else back(distance))
+    return results
+
+
+def visible_trees(heights):
+    """Matrix of whether each tree can be seen from any edge"""
+    return np.logical_or.reduce(
+        [visible for visible, _ in survey(heights, distances=False).values()]
+    )
+
+
+def scenic_scores(heights):
+    """Matrix of each tree's viewing distances multiplied together"""
+    return np.multiply.reduce([distance for _, distance in survey(heights).values()])
+
+
+def part1(heights):
+    return int(visible_trees(heights).sum())
 
-def parse_input():
-    with open(PUZZLE_INPUT, "r") as f:
-        lines = f.readlines()
-    return lines
-
-
-dtype = np.dtype(
-    [
-        ("x", int),
-        ("y", int),
-        ("height", int),
-        ("visible_north", bool),
-        (
-            "visible_south",
-            bool,
-        ),
-        (
-            "visible_east",
-            bool,
-        ),
-        ("visible_west", bool),
-        ("visible_north_count", int),
-        ("visible_south_count", int),
-        ("visible_east_count", int),
-        ("visible_west_count", int),
-    ]
-)
-array = np.empty((99, 99), dtype=dtype)
-lines = parse_input()
-for y, line in enumerate(lines):
-    values = line.strip()
-    for x, value in enumerate(values):
-        array[y][x]["x"] = x
-        array[y][x]["y"] = y
-        array[y][x]["height"] = int(value)
-
-
-def get_visible_trees(array, x, y, direction):
-    if direction == "north":
-        for i in range(y - 1, -1, -1):
-            if array[i][x]["height"] >= array[y][x]["height"]:
-                return False
-        return True
-    elif direction == "south":
-        for i in range(y + 1, len(array)):
-            if array[i][x]["height"] >= array[y][x]["height"]:
-                return False
-        return True
-    elif direction == "east":
-        for i in range(x + 1, len(array[y])):
-            if array[y][i]["height"] >= array[y][x]["height"]:
-                return False
-        return True
-    elif direction == "west":
-        for i in range(x - 1, -1, -1):
-            if array[y][i]["height"] >= array[y][x]["height"]:
-                return False
-        return True
-
-
-for y, line in enumerate(array):
-    for x, value in enumerate(line):
-        array[y][x]["visible_north"] = get_visible_trees(array, x, y, "north")
-        array[y][x]["visible_south"] = get_visible_trees(array, x, y, "south")
-        array[y][x]["visible_east"] = get_visible_trees(array, x, y, "east")
-        array[y][x]["visible_west"] = get_visible_trees(array, x, y, "west")
-
-visible_trees = 0
-for y, line in enumerate(array):
-    for x, value in enumerate(line):
-        if (
-            array[y][x]["visible_north"]
-            or array[y][x]["visible_south"]
-            or array[y][x]["visible_east"]
-            or array[y][x]["visible_west"]
-        ):
-            visible_trees += 1
-
-print(f"no. of visible trees: {visible_trees}")
 
 # --- Part Two ---
 # Content with the amount of tree cover available, the Elves just need to know the best spot to build their tree house: they would like to be able to see a lot of trees.
@@ -157,31 +193,17 @@ print(f"no. of visible trees: {visible_trees}")
 
 # Consider each tree on your map. What is the highest scenic score possible for any tree?
 
-most_scenic_score = 0
-for y, line in enumerate(array):
-    for x, value in enumerate(line):
-        north = 0
-        south = 0
-        east = 0
-        west = 0
-        for i in range(y - 1, -1, -1):
-            north += 1
-            if array[i][x]["height"] >= array[y][x]["height"]:
-                break
-        for i in range(y + 1, len(array)):
-            south += 1
-            if array[i][x]["height"] >= array[y][x]["height"]:
-                break
-        for i in range(x + 1, len(array[y])):
-            east += 1
-            if array[y][i]["height"] >= array[y][x]["height"]:
-                break
-        for i in range(x - 1, -1, -1):
-            west += 1
-            if array[y][i]["height"] >= array[y][x]["height"]:
-                break
-        scenic_score = prod([north, south, east, west])
-        if scenic_score > most_scenic_score:
-            most_scenic_score = scenic_score
-
-print(f"most scenic score: {most_scenic_score}")
+def part2(heights):
+    return int(scenic_scores(heights).max())
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        stream=sys.stdout,
+    )
+    with open(PUZZLE_INPUT) as f:
+        heights = parse(f.read())
+    print(f"no. of visible trees: {part1(heights)}")
+    print(f"most scenic score: {part2(heights)}")
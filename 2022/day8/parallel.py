@@ -0,0 +1,151 @@
+#!/usr/bin/python
+# --- Day 8: Treetop Tree House ---
+# Multi-core engine for big height maps, see challenge.py for the puzzle.
+# Looking left or right only involves the trees of one row, and looking up or
+# down those of one column, so blocks of rows and then blocks of columns are
+# swept by a process pool. The heights and the results live in shared memory:
+# the row blocks write the left and right results and the column blocks then
+# merge up and down into them, so no two tasks ever write the same cells.
+import logging
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from multiprocessing import shared_memory
+from typing import Optional, Tuple
+import numpy as np
+
+# Import local modules
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(SCRIPT_DIR)
+
+from challenge_numpy import parse
+from tiled import sweep_tile, tiles
+
+logger = logging.getLogger(__name__)
+PUZZLE_INPUT = f"{os.path.dirname(os.path.realpath(__file__))}/puzzle_input.txt"
+
+# name -> dtype of the matrices shared with the workers
+SHARED = {"heights": np.uint8, "visible": np.bool_, "scores": np.int64}
+
+
+def attach(names, shape):
+    """The shared matrices by name, with the blocks holding them
+
+    Workers share the resource tracker of the process that created the
+    blocks, which unlinks them once everyone is done.
+    """
+    blocks, matrices = [], {}
+    for key, name in names.items():
+        block = shared_memory.SharedMemory(name=name)
+        blocks.append(block)
+        matrices[key] = np.ndarray(shape, dtype=SHARED[key], buffer=block.buf)
+    return blocks, matrices
+
+
+def sweep_block(matrices, lines: Tuple[int, int], axis: int):
+    """Sweeps a block of rows (axis 0) or columns (axis 1) both ways, merging the results
+
+    The rows go first and write their results, the columns afterwards
+    combining theirs with what the rows left.
+    """
+    block = (slice(*lines), slice(None)) if axis == 0 else (slice(None), slice(*lines))
+    directions = ("left", "right") if axis == 0 else ("up", "down")
+    (seen, distance, _), (seen_back, distance_back, _) = (
+        sweep_tile(matrices["heights"][block], direction, None) for direction in directions
+    )
+    if axis == 0:
+        matrices["visible"][block] = seen | seen_back
+        matrices["scores"][block] = distance * distance_back
+    else:
+        matrices["visible"][block] |= seen | seen_back
+        matrices["scores"][block] *= distance * distance_back
+
+
+def sweep_shared_block(lines: Tuple[int, int], names, shape, axis: int):
+    """sweep_block in a worker, on the matrices in shared memory"""
+    blocks, matrices = attach(names, shape)
+    try:
+        sweep_block(matrices, lines, axis)
+    finally:
+        # the views have to go before the blocks can be closed
+        matrices.clear()
+        for block in blocks:
+            block.close()
+
+
+def survey_parallel(
+    heights: np.ndarray, workers: Optional[int] = None, block_lines: Optional[int] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Visibility and scenic score matrices of a height matrix, over a process pool
+
+    Args:
+        heights (np.ndarray): as challenge_numpy.parse
+        workers (Optional[int]): pool size, 1 runs everything in this process
+        block_lines (Optional[int]): rows or columns per task, by default
+            enough for about four tasks per worker
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: visible from any edge, scenic score
+    """
+    workers = workers or os.cpu_count()
+    shape = heights.shape
+    if block_lines is None:
+        block_lines = max(-(-max(shape) // (workers * 4)), 1)
+    if workers == 1:
+        matrices = {
+            "heights": heights,
+            "visible": np.empty(shape, dtype=np.bool_),
+            "scores": np.empty(shape, dtype=np.int64),
+        }
+        for axis in (0, 1):
+            for span in tiles(shape[axis], block_lines):
+                sweep_block(matrices, (span.start, span.stop), axis)
+        return matrices["visible"], matrices["scores"]
+
+    blocks = {
+        key: shared_memory.SharedMemory(
+            create=True, size=max(int(np.prod(shape)) * np.dtype(dtype).itemsize, 1)
+        )
+        for key, dtype in SHARED.items()
+    }
+    try:
+        names = {key: block.name for key, block in blocks.items()}
+        np.ndarray(shape, dtype=np.uint8, buffer=blocks["heights"].buf)[:] = heights
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for axis in (0, 1):
+                spans = [(span.start, span.stop) for span in tiles(shape[axis], block_lines)]
+                logger.debug("survey_parallel - axis %s in %s blocks", axis, len(spans))
+                # list() waits for the rows before the columns start merging into them
+                sweep = partial(sweep_shared_block, names=names, shape=shape, axis=axis)
+                list(pool.map(sweep, spans))
+        visible, scores = (
+            np.ndarray(shape, dtype=SHARED[key], buffer=blocks[key].buf).copy()
+            for key in ("visible", "scores")
+        )
+    finally:
+        for block in blocks.values():
+            block.close()
+            block.unlink()
+    return visible, scores
+
+
+def part1(heights):
+    return int(survey_parallel(heights)[0].sum())
+
+
+def part2(heights):
+    return int(survey_parallel(heights)[1].max())
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        stream=sys.stdout,
+    )
+    with open(PUZZLE_INPUT) as f:
+        heights = parse(f.read())
+    visible, scores = survey_parallel(heights)
+    print(f"no. of visible trees: {int(visible.sum())}")
+    print(f"most scenic score: {int(scores.max())}")
@@ -0,0 +1,128 @@
+#!/usr/bin/python
+# --- Day 8: Treetop Tree House ---
+# Out-of-core engine for height maps too big to hold in memory, see challenge.py
+# for the puzzle. The digit file is memory mapped and read a tile at a time,
+# the sweeps of challenge_numpy carrying their state from tile to tile.
+#
+# Going up from the bottom right, each tile is swept looking down and right,
+# which only needs what is below it and to its right, and the partial results
+# are kept in scratch memory maps. Going back down from the top left, the
+# sweeps looking up and left finish each tile off. Besides the tile itself
+# that holds one SweepState per tile column and one for the current row band.
+import logging
+import os
+import sys
+import tempfile
+from typing import Tuple
+import numpy as np
+
+# Import local modules
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(SCRIPT_DIR)
+
+from challenge_numpy import VIEWS, sweep
+
+logger = logging.getLogger(__name__)
+PUZZLE_INPUT = f"{os.path.dirname(os.path.realpath(__file__))}/puzzle_input.txt"
+
+
+def map_heights(path) -> np.ndarray:
+    """Read-only rows x columns view of the digits in a height map file
+
+    The view strides over the line endings in the memory map, so nothing is
+    read until a tile of it is used. The last line may lack its newline.
+    """
+    data = np.memmap(path, dtype=np.uint8, mode="r")
+    width = len(data)
+    for start in range(0, len(data), 1 << 20):
+        line_end = np.flatnonzero(data[start : start + (1 << 20)] == ord("\n"))
+        if line_end.size:
+            width = start + int(line_end[0])
+            break
+    rows = (len(data) - width) // (width + 1) + 1
+    return np.lib.stride_tricks.as_strided(data, shape=(rows, width), strides=(width + 1, 1))
+
+
+def tiles(length: int, size: int):
+    """Slices cutting range(length) into pieces of at most size"""
+    return [slice(start, min(start + size, length)) for start in range(0, length, size)]
+
+
+def sweep_tile(heights, direction, state, distances=True):
+    """challenge_numpy.sweep of one tile from the edge in direction, results turned back"""
+    into, back = VIEWS[direction]
+    visible, distance, state = sweep(into(heights), state, distances)
+    return back(visible), None if distance is None else back(distance), state
+
+
+def survey_file(path, tile_size: int = 1024, scratch_dir=None) -> Tuple[int, int]:
+    """Count of visible trees and the best scenic score of a height map file
+
+    Args:
+        path: file of digit rows, as the puzzle input
+        tile_size (int): rows and columns per tile, which bounds the memory used
+        scratch_dir (optional): where to keep the partial results, as for tempfile
+
+    Returns:
+        Tuple[int, int]: visible trees, highest scenic score
+    """
+    if os.path.getsize(path) == 0:
+        return 0, 0
+    digits = map_heights(path)
+    rows, columns = digits.shape
+    row_bands, column_bands = tiles(rows, tile_size), tiles(columns, tile_size)
+    logger.info(
+        "survey_file - %sx%s trees in %s tiles",
+        rows, columns, len(row_bands) * len(column_bands),
+    )
+
+    with tempfile.TemporaryFile(dir=scratch_dir) as visible_file, tempfile.TemporaryFile(
+        dir=scratch_dir
+    ) as score_file:
+        seen = np.memmap(visible_file, dtype=np.bool_, mode="w+", shape=digits.shape)
+        scores = np.memmap(score_file, dtype=np.int64, mode="w+", shape=digits.shape)
+
+        down = [None] * len(column_bands)
+        for band in reversed(row_bands):
+            right = None
+            for column, span in reversed(list(enumerate(column_bands))):
+                heights = digits[band, span] - ord("0")
+                seen_down, distance_down, down[column] = sweep_tile(heights, "down", down[column])
+                seen_right, distance_right, right = sweep_tile(heights, "right", right)
+                seen[band, span] = seen_down | seen_right
+                scores[band, span] = distance_down * distance_right
+            logger.debug("survey_file - rows %s-%s down and right", band.start, band.stop)
+
+        visible, best = 0, 0
+        up = [None] * len(column_bands)
+        for band in row_bands:
+            left = None
+            for column, span in enumerate(column_bands):
+                heights = digits[band, span] - ord("0")
+                seen_up, distance_up, up[column] = sweep_tile(heights, "up", up[column])
+                seen_left, distance_left, left = sweep_tile(heights, "left", left)
+                visible += int((seen[band, span] | seen_up | seen_left).sum())
+                best = max(best, int((scores[band, span] * distance_up * distance_left).max()))
+            logger.debug("survey_file - rows %s-%s up and left", band.start, band.stop)
+        del seen, scores
+
+    return visible, best
+
+
+def part1(path):
+    return survey_file(path)[0]
+
+
+def part2(path):
+    return survey_file(path)[1]
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        stream=sys.stdout,
+    )
+    visible, best = survey_file(PUZZLE_INPUT)
+    print(f"no. of visible trees: {visible}")
+    print(f"most scenic score: {best}")
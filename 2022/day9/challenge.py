@@ -238,21 +238,10 @@ import sys
 import logging
 import numpy as np
 
-logger = logging.getLogger("logger")
-logger.setLevel(logging.DEBUG)
-handler = logging.StreamHandler(sys.stdout)
-formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
-handler.setFormatter(formatter)
-logger.addHandler(handler)
+logger = logging.getLogger(__name__)
 PUZZLE_INPUT = f"{os.path.dirname(os.path.realpath(__file__))}/puzzle_input.txt"
 
 
-def parse_input():
-    with open(PUZZLE_INPUT, "r") as f:
-        lines = f.readlines()
-    return lines
-
-
 # class Rope:
 #     def __init__(self, x, y):
 #         self.x = x
@@ -321,7 +310,7 @@ class RopeHead:
         self.x += dx * distance
         self.y += dy * distance
         logger.debug(
-            f"[head] - moved {direction} {distance} steps to ({self.x}, {self.y})"
+            "[head] - moved %s %s steps to (%s, %s)", direction, distance, self.x, self.y
         )
 
 
@@ -360,23 +349,33 @@ class RopeTail:
             else:
                 logger.debug("[tail] - Head is below tail")
                 self.y -= 1
-        logger.debug(f"[tail] - moved to ({self.x}, {self.y})")
+        logger.debug("[tail] - moved to (%s, %s)", self.x, self.y)
         self.visited.add((self.x, self.y))
 
 
-rope = Rope()
-for line in parse_input():
-    move = line.split(" ")
-    direction = move[0]
-    distance = int(move[-1])
-    logger.debug(f"== {direction} {distance} ==")
-    logger.debug(
-        f"[rope] - head:({rope.head.x},{rope.head.y}), tail:({rope.tail.x},{rope.tail.y})"
-    )
-    for i in range(1, distance + 1):
-        rope.move(direction, 1)
+def parse(text):
+    moves = []
+    for line in text.splitlines():
+        move = line.split(" ")
+        moves.append((move[0], int(move[-1])))
+    return moves
+
+
+def part1(moves):
+    rope = Rope()
+    for direction, distance in moves:
+        logger.debug("== %s %s ==", direction, distance)
+        logger.debug(
+            "[rope] - head:(%s,%s), tail:(%s,%s)",
+            rope.head.x,
+            rope.head.y,
+            rope.tail.x,
+            rope.tail.y,
+        )
+        for i in range(1, distance + 1):
+            rope.move(direction, 1)
+    return len(rope.get_visited())
 
-print(f"tail visited {len(rope.get_visited())} positions")
 
 """
 --- Part Two ---
@@ -812,3 +811,19 @@ Simulate your complete series of motions on a larger rope with ten knots. How ma
 
 
 """
+
+
+def part2(moves):
+    # Part two hasn't been solved yet
+    return None
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.DEBUG,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        stream=sys.stdout,
+    )
+    with open(PUZZLE_INPUT) as f:
+        moves = parse(f.read())
+    print(f"tail visited {part1(moves)} positions")
@@ -8,20 +8,28 @@ a1b2c3d4e5f
 treb7uchet
 """
 
-def solve():
+def parse(text):
+    return [line for line in text.splitlines() if line.strip()]
+
+def part1(lines):
     total = 0
-    for line in example:
-        logger.debug(f"line: {line}")
+    for line in lines:
+        logger.debug("line: {}", line)
         c = 0
-        line_ints = re.findall(r'\d+', line)
+        line_ints = re.findall(r'\d', line)
         line_ints = [int(i) for i in line_ints]
-        logger.debug(f"line_ints: {line_ints}")
+        logger.debug("line_ints: {}", line_ints)
 
         first_int = line_ints[0]
         last_int = line_ints[-1]
-        logger.debug(f"ints: {first_int}, {last_int}")
+        logger.debug("ints: {}, {}", first_int, last_int)
 
         c = first_int * 10 + last_int
-        logger.debug(f"c: {c}")
+        logger.debug("c: {}", c)
+
+        total += c
+    return total
 
-    total += c
+def part2(lines):
+    # Part two hasn't been solved yet
+    return None
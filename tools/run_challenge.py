@@ -1,4 +1,18 @@
+import hashlib
+import inspect
+import logging
+import os
+import signal
+import sqlite3
 import subprocess
+import sys
+import time
+import math
+import statistics
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
+from typing import List
 import typer
 from loguru import logger
 import importlib
@@ -6,31 +20,70 @@ from pathlib import Path
 
 app = typer.Typer()
 
+PARTS = ("part1", "part2")
+CACHE_FILENAME = ".cache/results.sqlite"
+
+
+@lru_cache(maxsize=None)
 def get_git_root_path():
     return subprocess.check_output(['git', 'rev-parse', '--show-toplevel']).decode('utf-8').strip()
 
+class InterceptHandler(logging.Handler):
+    """Hands records from the day modules' standard library loggers to loguru"""
+
+    def emit(self, record):
+        try:
+            level = logger.level(record.levelname).name
+        except ValueError:
+            level = record.levelno
+        # report the day module's frame as the caller, not the logging module's
+        frame, depth = inspect.currentframe(), 0
+        while frame and (depth == 0 or frame.f_code.co_filename == logging.__file__):
+            frame = frame.f_back
+            depth += 1
+        logger.opt(depth=depth, exception=record.exc_info).log(level, record.getMessage())
+
 def setup_logging(log_level):
+    """The one place logging is configured, day modules only create loggers
+
+    Records below log_level are dropped before their messages are built, so
+    at the default level debug logging in the days costs nothing.
+    """
     log_level = log_level.upper()
+    logger.remove()
+    logger.add(sys.stderr, level=log_level)
     logger.add("debug.log", format="{time} {level} {message}", level=log_level)
+    logging.basicConfig(handlers=[InterceptHandler()], level=log_level, force=True)
     logger.debug(f"Logging initialized at {log_level} level")
 
-@app.command()
-def run(day: int = typer.Option(..., "--day", help="The day of the challenge"),
-        year: int = typer.Option(2023, "--year", help="The year of the challenge"),
-        log_level: str = typer.Option("INFO", "--log-level", help="Logging level")):
-    setup_logging(log_level)
+def find_days(year):
+    year_dir = Path(get_git_root_path()) / str(year)
+    return sorted(
+        int(day_dir.name[3:])
+        for day_dir in year_dir.glob("day*")
+        if (day_dir / "challenge.py").exists()
+    )
+
+def find_years():
+    git_root = Path(get_git_root_path())
+    return sorted(int(year_dir.name) for year_dir in git_root.glob("[0-9]" * 4) if year_dir.is_dir())
+
+def import_day(year, day):
     git_root = get_git_root_path()
-    logger.debug(f"Git root path: {git_root}")
+    if git_root not in sys.path:
+        sys.path.insert(0, git_root)
 
-    day_module_name = f"day{day:02d}"
+    module_name = f"{year}.day{day}.challenge"
     try:
-        day_module = importlib.import_module(f"{year}.{day_module_name}")
-        logger.debug(f"Imported module: {year}.{day_module_name}")
+        day_module = importlib.import_module(module_name)
+        logger.debug(f"Imported module: {module_name}")
     except ModuleNotFoundError:
         logger.error(f"Module for Year {year}, Day {day:02d} not found.")
         raise typer.Exit(code=1)
+    return day_module
 
-    input_path = Path(git_root) / f"{year}/day{day:02d}/puzzle_input.txt"
+def read_input(year, day):
+    input_path = Path(get_git_root_path()) / f"{year}/day{day}/puzzle_input.txt"
     logger.debug(f"Input path: {input_path}")
     if not input_path.exists():
         logger.error(f"Input file for Year {year}, Day {day:02d} not found.")
@@ -39,9 +92,262 @@ def run(day: int = typer.Option(..., "--day", help="The day of the challenge"),
     with open(input_path) as f:
         input_data = f.read()
     logger.debug("Input data read successfully")
+    return input_data
+
+def load_day(year, day):
+    return import_day(year, day), read_input(year, day)
+
+def cache_key(year, day, input_data):
+    # Every source file in the day's package counts, e.g. day7's classes.py
+    source_digest = hashlib.sha256()
+    for source_path in sorted((Path(get_git_root_path()) / f"{year}/day{day}").glob("*.py")):
+        source_digest.update(source_path.name.encode())
+        source_digest.update(source_path.read_bytes())
+    input_digest = hashlib.sha256(input_data.encode())
+    return source_digest.hexdigest(), input_digest.hexdigest()
+
+class ResultCache:
+    """Answers and timings stored on disk, keyed by (source hash, input hash, phase).
+
+    Editing a day or its input changes the key, so stale rows are never read,
+    they just age out. Each write evicts the least recently used entries (every
+    phase of a key goes together) beyond max_entries.
+    """
+
+    def __init__(self, path, max_entries=1024):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.connection = sqlite3.connect(path)
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "source_hash TEXT, input_hash TEXT, phase TEXT, result TEXT, wall REAL, cpu REAL, last_used REAL, "
+                "PRIMARY KEY (source_hash, input_hash, phase))"
+            )
+
+    def get(self, key):
+        with self.connection:
+            rows = self.connection.execute(
+                "SELECT phase, result, wall, cpu FROM results WHERE source_hash = ? AND input_hash = ? ORDER BY rowid",
+                key,
+            ).fetchall()
+            if rows:
+                self.connection.execute(
+                    "UPDATE results SET last_used = ? WHERE source_hash = ? AND input_hash = ?",
+                    (time.time(), *key),
+                )
+        phases = {phase: (result, wall, cpu) for phase, result, wall, cpu in rows}
+        # an entry without its answers is a miss, not a hit that prints nothing
+        if not (set(PARTS) <= phases.keys() or "solve" in phases):
+            return None
+        return phases
+
+    def put(self, key, phases):
+        now = time.time()
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (*key, phase, None if result is None else str(result), wall, cpu, now)
+                    for phase, (result, wall, cpu) in phases.items()
+                ],
+            )
+            self.connection.execute(
+                "DELETE FROM results WHERE (source_hash, input_hash) NOT IN "
+                "(SELECT source_hash, input_hash FROM results GROUP BY source_hash, input_hash "
+                "ORDER BY MAX(last_used) DESC LIMIT ?)",
+                (self.max_entries,),
+            )
+
+def open_cache(no_cache, cache_size):
+    if no_cache:
+        return None
+    return ResultCache(Path(get_git_root_path()) / CACHE_FILENAME, cache_size)
+
+def timed(func, *args):
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    result = func(*args)
+    return result, time.perf_counter() - wall_start, time.process_time() - cpu_start
+
+def run_phases(day_module, input_data):
+    """Run one day, timing each phase separately.
+
+    Modules exposing parse/part1/part2 are timed per phase, with a single parse
+    shared by both parts. Older modules only expose solve(input_data).
+    Returns {phase: (result, wall_seconds, cpu_seconds)}.
+    """
+    if not hasattr(day_module, "parse"):
+        return {"solve": timed(day_module.solve, input_data)}
+
+    parsed, parse_wall, parse_cpu = timed(day_module.parse, input_data)
+    phases = {"parse": (None, parse_wall, parse_cpu)}
+    for part in PARTS:
+        phases[part] = timed(getattr(day_module, part), parsed)
+    return phases
+
+class DayTimeout(Exception):
+    pass
+
+def _raise_day_timeout(signum, frame):
+    raise DayTimeout()
+
+def solve_day(year, day, timeout=None):
+    """Load and run a single day, for use inside a worker process.
+
+    The timeout is enforced in the worker itself with SIGALRM so it covers only
+    this day, not the time it spent queued behind others. Results are returned
+    as strings so they always pickle back to the parent.
+    """
+    outcome = {"year": year, "day": day, "status": "ok", "phases": {}}
+    if timeout:
+        signal.signal(signal.SIGALRM, _raise_day_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        (day_module, input_data), load_wall, load_cpu = timed(load_day, year, day)
+        outcome["phases"]["load"] = (None, load_wall, load_cpu)
+        for phase, (result, wall, cpu) in run_phases(day_module, input_data).items():
+            outcome["phases"][phase] = (None if result is None else str(result), wall, cpu)
+    except DayTimeout:
+        outcome["status"] = f"timeout ({timeout}s)"
+    except Exception as e:
+        outcome["status"] = f"error: {type(e).__name__}: {e}"
+    finally:
+        if timeout:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    return outcome
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[max(math.ceil(pct / 100 * len(ordered)) - 1, 0)]
+
+def summarize(samples):
+    return {
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "p95": percentile(samples, 95),
+    }
+
+def print_table(header, rows):
+    widths = [max(len(str(row[i])) for row in [header] + rows) for i in range(len(header))]
+    for row in [header] + rows:
+        typer.echo("  ".join(str(cell).rjust(width) for cell, width in zip(row, widths)))
+
+@app.command()
+def run(day: int = typer.Option(..., "--day", help="The day of the challenge"),
+        year: int = typer.Option(2023, "--year", help="The year of the challenge"),
+        no_cache: bool = typer.Option(False, "--no-cache", help="Always recompute, ignoring cached results"),
+        cache_size: int = typer.Option(1024, "--cache-size", min=1, help="Cached day results to keep before evicting"),
+        log_level: str = typer.Option("INFO", "--log-level", help="Logging level")):
+    setup_logging(log_level)
+    logger.debug(f"Git root path: {get_git_root_path()}")
+
+    cache = open_cache(no_cache, cache_size)
+    input_data = read_input(year, day)
+    key = cache_key(year, day, input_data)
+    phases = cache.get(key) if cache else None
+    if phases:
+        logger.debug(f"Cache hit for Year {year}, Day {day:02d}")
+    else:
+        phases = run_phases(import_day(year, day), input_data)
+        if cache:
+            cache.put(key, phases)
+    for phase, (result, wall, cpu) in phases.items():
+        logger.debug(f"{phase} took {wall * 1000:.3f}ms wall, {cpu * 1000:.3f}ms cpu")
+        # rows cached by run-all also hold its load phase, which has no answer
+        if phase in PARTS or phase == "solve":
+            logger.info(f"Result for Year {year}, Day {day:02d}, {phase}: {result}")
+
+@app.command()
+def bench(day: List[int] = typer.Option(None, "--day", help="Day(s) to benchmark, every day of the year if omitted"),
+          year: int = typer.Option(2023, "--year", help="The year of the challenge"),
+          repeat: int = typer.Option(5, "--repeat", min=1, help="Timed runs per day"),
+          warmup: int = typer.Option(1, "--warmup", min=0, help="Untimed runs per day before timing"),
+          log_level: str = typer.Option("INFO", "--log-level", help="Logging level")):
+    setup_logging(log_level)
+    days = day or find_days(year)
+
+    # Import everything up front so module loading never lands in a timed run
+    day_modules = {d: load_day(year, d) for d in days}
+
+    rows = []
+    for d, (day_module, input_data) in day_modules.items():
+        for _ in range(warmup):
+            run_phases(day_module, input_data)
+
+        wall_samples, cpu_samples = defaultdict(list), defaultdict(list)
+        for _ in range(repeat):
+            for phase, (_result, wall, cpu) in run_phases(day_module, input_data).items():
+                wall_samples[phase].append(wall)
+                cpu_samples[phase].append(cpu)
+
+        for phase in wall_samples:
+            wall_stats = summarize(wall_samples[phase])
+            cpu_stats = summarize(cpu_samples[phase])
+            rows.append(
+                [f"{year}/day{d}", phase]
+                + [f"{wall_stats[stat] * 1000:.3f}" for stat in ("min", "median", "p95")]
+                + [f"{cpu_stats[stat] * 1000:.3f}" for stat in ("min", "median", "p95")]
+            )
+            logger.debug(f"{year}/day{d} {phase}: wall {wall_stats}, cpu {cpu_stats}")
+
+    print_table(
+        ["day", "phase", "wall min ms", "wall med ms", "wall p95 ms", "cpu min ms", "cpu med ms", "cpu p95 ms"],
+        rows,
+    )
+
+@app.command("run-all")
+def run_all(year: List[int] = typer.Option(None, "--year", help="Year(s) to run, every year in the repo if omitted"),
+            workers: int = typer.Option(os.cpu_count(), "--workers", min=1, help="Number of worker processes"),
+            timeout: float = typer.Option(None, "--timeout", min=0, help="Per-day timeout in seconds"),
+            no_cache: bool = typer.Option(False, "--no-cache", help="Always recompute, ignoring cached results"),
+            cache_size: int = typer.Option(1024, "--cache-size", min=1, help="Cached day results to keep before evicting"),
+            log_level: str = typer.Option("INFO", "--log-level", help="Logging level")):
+    setup_logging(log_level)
+    days = [(y, d) for y in (year or find_years()) for d in find_days(y)]
+
+    started = time.perf_counter()
+    # Only the parent touches the cache, workers just solve the misses
+    cache = open_cache(no_cache, cache_size)
+    outcomes, keys, misses = [], {}, []
+    for y, d in days:
+        phases = None
+        if cache:
+            # a day that can't be read is reported on its own, the rest still run
+            try:
+                keys[(y, d)] = cache_key(y, d, read_input(y, d))
+            except (typer.Exit, OSError) as e:
+                reason = "input not found" if isinstance(e, typer.Exit) else f"{type(e).__name__}: {e}"
+                outcomes.append({"year": y, "day": d, "status": f"error: {reason}", "phases": {}})
+                continue
+            phases = cache.get(keys[(y, d)])
+        if phases:
+            outcomes.append({"year": y, "day": d, "status": "cached", "phases": phases})
+        else:
+            misses.append((y, d))
+    logger.info(f"Running {len(misses)} of {len(days)} days across {workers} workers")
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(solve_day, y, d, timeout) for y, d in misses]
+        for future in as_completed(futures):
+            outcome = future.result()
+            logger.debug(f"{outcome['year']}/day{outcome['day']} finished: {outcome['status']}")
+            if cache and outcome["status"] == "ok":
+                cache.put(keys[(outcome["year"], outcome["day"])], outcome["phases"])
+            outcomes.append(outcome)
+    elapsed = time.perf_counter() - started
+
+    rows = []
+    for outcome in sorted(outcomes, key=lambda o: (o["year"], o["day"])):
+        name = f"{outcome['year']}/day{outcome['day']}"
+        if not outcome["phases"]:
+            rows.append([name, outcome["status"], "", "", "", ""])
+        for phase, (result, wall, cpu) in outcome["phases"].items():
+            rows.append([name, outcome["status"], phase, "" if result is None else result,
+                         f"{wall * 1000:.3f}", f"{cpu * 1000:.3f}"])
+    print_table(["day", "status", "phase", "result", "wall ms", "cpu ms"], rows)
 
-    result = day_module.solve(input_data)
-    logger.info(f"Result for Year {year}, Day {day:02d}: {result}")
+    serial = sum(wall for o in outcomes if o["status"] == "ok" for _result, wall, _cpu in o["phases"].values())
+    typer.echo(f"{len(outcomes)} days in {elapsed:.3f}s wall ({serial:.3f}s of work)")
 
 if __name__ == "__main__":
     app()